@@ -1,12 +1,38 @@
-from smart_match import DataLoader, Matcher
+from smart_match import DataLoader, Matcher, DEFAULT_WEIGHTS
+import argparse
+import csv
+import sys
 import pandas as pd
 import numpy as np
 
+parser = argparse.ArgumentParser(description="Score distribution of everyone's ideal match")
+parser.add_argument('--weights', metavar='PATH', help="JSON file overriding scoring weights")
+parser.add_argument('--sweep', metavar='PATH', help="JSON list of weight configs, or grid {key: [values]}: summarize each against the current weights instead")
+parser.add_argument('--workers', type=int, default=1, help="Worker processes for --sweep (default: %(default)s)")
+parser.add_argument('--out', help="Also write the --sweep summaries as CSV to this file")
+args = parser.parse_args()
+
 loader = DataLoader('data.csv')
 df = loader.load_and_clean()
-matcher = Matcher(df)
+matcher = Matcher(df, workers=args.workers, cache_dir=".score_cache", weights=args.weights) # Reused across runs while data.csv is unchanged
+
+if args.sweep:
+    summaries = matcher.sweep_weights(args.sweep)
+    print(f"{'#':>4} {'Matched':>8} {'Unmatched':>9} {'Min':>6} {'P10':>6} {'Median':>6} {'Mean':>6} {'P90':>6} {'Max':>6} {'Changed':>7}  Weights")
+    for i, s in enumerate(summaries, 1):
+        changed = " ".join(f"{k}={v}" for k, v in s['weights'].items() if v != DEFAULT_WEIGHTS[k]) or "defaults"
+        print(f"{i:>4} {s['matched']:>8} {s['unmatched']:>9} {s['best_min']:>6.1f} {s['best_p10']:>6.1f} {s['best_median']:>6.1f} "
+              f"{s['best_mean']:>6.1f} {s['best_p90']:>6.1f} {s['best_max']:>6.1f} {s['changed']:>7}  {changed}")
+    if args.out:
+        rows = [{'config': i, **s['weights'], **{k: v for k, v in s.items() if k != 'weights'}} for i, s in enumerate(summaries, 1)]
+        with open(args.out, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['config'])
+            writer.writeheader()
+            writer.writerows(rows)
+    sys.exit()
 
 all_scores = []
+scores = matcher.score_matrix(mode="romantic") # Shared with find_ideal_matches
 matches = matcher.find_ideal_matches()
 
 for user_id, (match_id, score) in matches.items():
@@ -19,6 +45,13 @@ print(f"Max Score: {max(all_scores) if all_scores else 'N/A'}")
 print(f"Mean Score: {np.mean(all_scores) if all_scores else 'N/A'}")
 print(f"Median Score: {np.median(all_scores) if all_scores else 'N/A'}")
 
+# Pair-level view straight from the score matrix
+off_diagonal = ~np.eye(len(matcher.ids), dtype=bool)
+print(f"Compatible Pairs: {int(((scores > -500) & off_diagonal).sum())} of {int(off_diagonal.sum())}")
+
+blocking = matcher.blocking_stats(mode="romantic")
+print(f"Pairs Pruned by Blocking: {blocking['pruned_pairs']} of {blocking['total_pairs']} ({blocking['pruned_fraction']:.1%}, {blocking['buckets']} buckets)")
+
 # Check coverage
 unmatched = [uid for uid in matcher.ids if matches[uid][1] <= -500]
 print(f"Unmatched Users: {len(unmatched)}")
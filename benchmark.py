@@ -0,0 +1,169 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from smart_match import DataLoader, Matcher
+
+# Benchmarks the matching pipeline on synthetic cohorts in the data.csv form schema.
+# Answers are drawn column by column from the empirical distribution of the real export,
+# so category mixes (and therefore bucket sizes and compatibility rates) stay realistic.
+#
+#   python benchmark.py                       # 100 / 1k / 10k / 50k rows
+#   python benchmark.py --sizes 100,1000      # quick run
+#
+# Every run is appended to a JSON history (benchmarks.json) and compared to the previous
+# comparable run at the same size, so regressions show up as ratios > 1.
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+SCORE_SAMPLE_PAIRS = 2000 # calculate_score is per pair; time a fixed sample and report throughput
+
+
+def synthesize_cohort(source_df, n, seed=0):
+    """
+    n synthetic respondents with the export's raw column names (DataLoader.column_map keys).
+    """
+    rng = np.random.default_rng(seed)
+    columns = list(DataLoader(None).column_map)
+    cohort = {}
+    for col in columns:
+        values = source_df[col].to_numpy(dtype=object)
+        cohort[col] = values[rng.integers(0, len(values), n)]
+    cohort["Name (First + Last)"] = [f"Person {i}" for i in range(n)]
+    cohort["Student Email"] = [f"p{i}@example.edu" for i in range(n)]
+    cohort["Phone Number"] = [f"555{i:07d}" for i in range(n)]
+    return pd.DataFrame(cohort, columns=columns)
+
+
+class StageTimer:
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        result = {"seconds": round(elapsed, 4)}
+        if self.memory:
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        self.stages[name] = result
+
+    def print(self):
+        for name, result in self.stages.items():
+            print(f"  {name:<20} {result['seconds']:9.3f}s" + (f"  {result['peak_mb']:9.1f} MB" if self.memory else ""))
+
+
+def run_size(source_df, n, workdir, memory=True, seed=0):
+    print(f"\n--- {n} rows ---")
+    csv_path = os.path.join(workdir, f"cohort_{n}.csv")
+    synthesize_cohort(source_df, n, seed).to_csv(csv_path, index=False)
+
+    timer = StageTimer(memory)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage("load_and_clean"):
+            df = DataLoader(csv_path).load_and_clean()
+        with timer.stage("encode"):
+            matcher = Matcher(df)
+
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, n, (SCORE_SAMPLE_PAIRS, 2))
+    with timer.stage("calculate_score"):
+        for a, b in pairs:
+            matcher.calculate_score(matcher.ids[a], matcher.ids[b])
+    score_rate = SCORE_SAMPLE_PAIRS / max(timer.stages["calculate_score"]["seconds"], 1e-9)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage("find_ideal_matches"):
+            matches = matcher.find_ideal_matches()
+        with timer.stage("find_groups"):
+            groups = matcher.find_groups()
+        with timer.stage("report"):
+            matcher.generate_report(matches, groups)
+
+    os.remove(csv_path)
+    timer.print()
+    print(f"  calculate_score throughput: {score_rate:,.0f} pairs/s")
+    return {"rows": n, "stages": timer.stages, "calculate_score_pairs_per_sec": round(score_rate, 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, results):
+    """
+    Prints current / previous time per stage for sizes present in both runs.
+    """
+    if not previous:
+        return
+    before = {r["rows"]: r for r in previous["results"]}
+    print(f"\n--- Versus previous run ({previous.get('commit')}, {previous['timestamp']}) ---")
+    for result in results:
+        old = before.get(result["rows"])
+        if old is None:
+            continue
+        ratios = []
+        for name, stage in result["stages"].items():
+            if name in old["stages"] and old["stages"][name]["seconds"] > 0:
+                ratios.append(f"{name} x{stage['seconds'] / old['stages'][name]['seconds']:.2f}")
+        print(f"  {result['rows']} rows: " + ", ".join(ratios))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matching pipeline benchmarks")
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)), help="Comma separated cohort sizes (default: %(default)s)")
+    parser.add_argument('--source', default='data.csv', help="Export whose answer distributions are sampled (default: %(default)s)")
+    parser.add_argument('--history', default='benchmarks.json', help="JSON history file to append to (default: %(default)s)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc peak memory tracking (it slows Python-heavy stages several times)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    source_df = pd.read_csv(args.source)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    memory = not args.no_memory
+
+    if memory:
+        tracemalloc.start()
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [run_size(source_df, n, workdir, memory, args.seed) for n in sizes]
+    if memory:
+        tracemalloc.stop()
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+    # tracemalloc overhead skews timings, so only compare like with like
+    comparable = [run for run in history if run.get("memory_tracked") == memory]
+    compare(comparable[-1] if comparable else None, results)
+
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "memory_tracked": memory,
+        "results": results,
+    })
+    with open(args.history, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"\nAppended results to {args.history}")
@@ -1,37 +1,102 @@
 import pandas as pd
+import numpy as np
+import argparse
 import json
+import os
+
+CHUNK_ROWS = 100000
+
+def iter_user_responses(input_file, chunksize=CHUNK_ROWS):
+    """
+    Yields (user_id, {question: answer}) from the long-format CSV, one user at a time and in
+    order of first appearance, reading `chunksize` rows at a time.
+
+    Each chunk is reshaped in one vectorized pass: the question columns become an object
+    array, and np.nonzero over the "answered" mask lists the (row, question) cells in
+    row-major order. That is the same order the original row-by-row loop used, so later
+    answers still overwrite earlier ones.
+    A user's rows must be contiguous (merge.py writes them that way). Users are emitted once
+    a different user follows them, so memory stays bounded by the chunk size.
+    """
+    pending = {} # Users that may continue into the next chunk
+    emitted = set()
+
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        questions = [col for col in chunk.columns if col != 'User_ID']
+        user_ids = chunk['User_ID'].to_numpy(dtype=object)
+        values = chunk[questions].to_numpy(dtype=object)
+        answered = pd.notna(values) & (values != '')
+
+        for user_id in pd.unique(user_ids):
+            if user_id in emitted:
+                raise ValueError(f"Rows for {user_id} are not contiguous; sort the input by User_ID first")
+            pending.setdefault(user_id, {})
+        rows, cols = np.nonzero(answered)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            pending[user_ids[row]][questions[col]] = str(values[row, col])
+
+        # Every user except the chunk's last one is complete
+        last_user = user_ids[-1]
+        for user_id in [u for u in pending if u != last_user]:
+            emitted.add(user_id)
+            yield user_id, pending.pop(user_id)
+
+    for user_id, responses in pending.items():
+        yield user_id, responses
+
+def write_json(users, f):
+    """
+    Writes the nested {user_id: {question: answer}} JSON incrementally, byte-identical to
+    json.dump(..., indent=4, ensure_ascii=False) of the whole dictionary.
+    """
+    dumps = json.JSONEncoder(ensure_ascii=False).encode # C string encoder; indent=4 would use the pure-Python one
+    count = 0
+    for user_id, responses in users:
+        if isinstance(user_id, str):
+            body = ",\n".join(f"        {dumps(q)}: {dumps(a)}" for q, a in responses.items())
+            entry = f"\n    {dumps(user_id)}: " + (f"{{\n{body}\n    }}" if responses else "{}")
+        else: # Let json coerce unusual keys exactly as json.dump would
+            entry = json.dumps({user_id: responses}, indent=4, ensure_ascii=False)[1:-2]
+        f.write(("{" if count == 0 else ",") + entry)
+        count += 1
+    f.write("\n}" if count else "{}")
+    return count
+
+def write_jsonl(users, f):
+    """
+    One {"User_ID": ..., "responses": {...}} object per line.
+    """
+    count = 0
+    for user_id, responses in users:
+        f.write(json.dumps({'User_ID': user_id, 'responses': responses}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+def convert_csv_to_json(input_file='merged_preferences.csv', output_file='responses.json', fmt=None, chunksize=CHUNK_ROWS):
+    fmt = fmt or ('jsonl' if os.path.splitext(output_file)[1].lower() in ('.jsonl', '.ndjson') else 'json')
 
-def convert_csv_to_json():
     print("Reading CSV file...")
-    df = pd.read_csv('merged_preferences.csv')
-    
-    # Initialize dictionary to store the formatted data
-    user_responses = {}
-    
+    users = iter_user_responses(input_file, chunksize)
+
     print("Converting data format...")
-    # Iterate through each row in the dataframe
-    for index, row in df.iterrows():
-        user_id = row['User_ID']  # Using correct column name
-        
-        # If this user isn't in our dictionary yet, add them
-        if user_id not in user_responses:
-            user_responses[user_id] = {}
-        
-        # Add non-empty responses to the user's data
-        for column in df.columns:
-            if column != 'User_ID' and pd.notna(row[column]) and row[column] != '':
-                user_responses[user_id][column] = str(row[column])
-    
-    # Write to JSON file
     print("Writing to JSON file...")
-    with open('responses.json', 'w') as f:
-        json.dump(user_responses, f, indent=4, ensure_ascii=False)
-    
-    print("Conversion complete! Data saved to responses.json")
-    print(f"Total number of users converted: {len(user_responses)}")
+    tmp = f"{output_file}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        count = write_jsonl(users, f) if fmt == 'jsonl' else write_json(users, f)
+    os.replace(tmp, output_file) # Never leave a half-written output behind
+
+    print(f"Conversion complete! Data saved to {output_file}")
+    print(f"Total number of users converted: {count}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert merged preferences (long CSV) to per-user JSON")
+    parser.add_argument('--input', default='merged_preferences.csv')
+    parser.add_argument('--output', default='responses.json')
+    parser.add_argument('--format', choices=['json', 'jsonl'], help="Output format (default: from the --output extension, else json)")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS, help="CSV rows per chunk (default: %(default)s)")
+    args = parser.parse_args()
+
     try:
-        convert_csv_to_json()
+        convert_csv_to_json(args.input, args.output, args.format, args.chunksize)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -1,10 +1,68 @@
-from textblob import TextBlob
+import argparse
 import json
+import os
+import numpy as np
+from collections import OrderedDict
 from time import sleep
 
+SENTIMENT_CACHE_FILE = '.sentiment_cache.json'
+
+class SentimentCache:
+    """
+    Sentiment polarity per unique normalized response (whitespace-collapsed, lowercased;
+    TextBlob's polarity is case-insensitive), kept in a bounded LRU and persisted to a
+    local JSON file between runs. TextBlob is only imported when a response misses the cache.
+    """
+    def __init__(self, path=SENTIMENT_CACHE_FILE, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.dirty = False
+        self._textblob = None
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.entries.update(json.load(f))
+            except (OSError, ValueError):
+                self.entries.clear() # Unreadable cache: start over
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(str(text).split()).lower()
+
+    def polarity(self, text):
+        key = self.normalize(text)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self._textblob is None:
+            from textblob import TextBlob
+            self._textblob = TextBlob
+        value = self._textblob(key).sentiment.polarity
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+        return value
+
+    def save(self):
+        """Writes the cache file if anything new was scored."""
+        if not self.path or not self.dirty:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
 class Matcher:
-    def __init__(self, user_data):
+    def __init__(self, user_data, sentiment_cache=None, verbose=False):
         self.user_data = user_data
+        self.verbose = verbose # Log every pair compared in get_top_matches
+        self.user_ids = list(user_data)
+        self.positions = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        self._matrix = None
+        self.sentiment = sentiment_cache if sentiment_cache is not None else SentimentCache()
         # Define weights for different questions (can be adjusted)
         self.question_weights = {
             "What is your favorite book genre?": 1.0,
@@ -23,12 +81,14 @@ class Matcher:
         if response1.lower() == response2.lower():
             return 1.0
         
-        # Calculate sentiment similarity as a backup
+        # Calculate sentiment similarity as a backup (polarity is cached per unique response)
         try:
-            sent1 = TextBlob(str(response1)).sentiment.polarity
-            sent2 = TextBlob(str(response2)).sentiment.polarity
+            sent1 = self.sentiment.polarity(response1)
+            sent2 = self.sentiment.polarity(response2)
             return 1 - abs(sent1 - sent2)
-        except:
+        except ImportError:
+            raise
+        except Exception:
             return 0.0
 
     def get_compatibility_score(self, user1_data, user2_data):
@@ -50,21 +110,60 @@ class Matcher:
         
         return total_score / total_weight
 
+    def encode_responses(self):
+        """
+        Per question: an int code per user (-1 if unanswered) and the list of distinct answers.
+        """
+        encoded = {}
+        for question in self.question_weights:
+            vocab = {}
+            codes = np.full(len(self.user_ids), -1, dtype=np.int64)
+            for i, user_id in enumerate(self.user_ids):
+                answers = self.user_data[user_id]
+                if question in answers:
+                    codes[i] = vocab.setdefault(answers[question], len(vocab))
+            encoded[question] = (codes, list(vocab))
+        return encoded
+
+    def compatibility_matrix(self):
+        """
+        N x N array where [i, j] == get_compatibility_score(user i, user j), in user_data order.
+        Each question's similarity is computed once per pair of distinct answers (a small table)
+        and gathered for every user pair; terms are summed in question_weights order, as in
+        get_compatibility_score. Built once and cached.
+        """
+        if self._matrix is None:
+            n = len(self.user_ids)
+            total_score = np.zeros((n, n))
+            total_weight = np.zeros((n, n))
+            for question, (codes, answers) in self.encode_responses().items():
+                weight = self.question_weights[question]
+                table = np.array([[self.calculate_response_similarity(a, b) for b in answers] for a in answers]).reshape(len(answers), len(answers))
+                both = (codes[:, None] >= 0) & (codes[None, :] >= 0)
+                similarity = np.where(both, table[codes[:, None], codes[None, :]] if len(answers) else 0.0, 0.0)
+                total_score += np.where(both, similarity * weight, 0.0)
+                total_weight += np.where(both, weight, 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._matrix = np.where(total_weight == 0, 0.0, total_score / total_weight)
+        return self._matrix
+
     def get_top_matches(self, user_id, top_n=3):
         """Find top matches for a given user"""
         print(f"\nFinding matches for {user_id}...")
-        user_data = self.user_data[user_id]
-        compatibility_scores = []
+        pos = self.positions[user_id]
+        scores = self.compatibility_matrix()[pos]
+        others = np.delete(np.arange(len(self.user_ids)), pos)
 
-        for other_id, other_data in self.user_data.items():
-            if other_id != user_id:
-                compatibility = self.get_compatibility_score(user_data, other_data)
-                compatibility_scores.append((other_id, compatibility))
-                print(f"Compatibility with {other_id}: {compatibility:.2f}")
+        if self.verbose:
+            for other in others:
+                print(f"Compatibility with {self.user_ids[other]}: {scores[other]:.2f}")
 
-        # Sort by compatibility score in descending order
-        compatibility_scores.sort(key=lambda x: x[1], reverse=True)
-        return compatibility_scores[:top_n]
+        # Everyone tied with the top_n-th best, then a stable sort: same order as sorting the full list
+        if 0 < top_n < len(others):
+            kth = np.partition(-scores[others], top_n - 1)[top_n - 1]
+            others = others[-scores[others] <= kth]
+        best = others[np.argsort(-scores[others], kind='stable')][:top_n]
+        return [(self.user_ids[i], float(scores[i])) for i in best]
 
 def load_user_data(filename):
     """Load user response data from JSON file"""
@@ -73,7 +172,9 @@ def load_user_data(filename):
 
 def create_groups(matcher, user_data, group_size=8):
     """Create groups of users based on compatibility scores"""
-    
+    scores = matcher.compatibility_matrix()
+    pos = matcher.positions
+
     # Create a copy of users that we can modify
     available_users = list(user_data.keys())
     groups = []
@@ -86,30 +187,20 @@ def create_groups(matcher, user_data, group_size=8):
         first_user = available_users[0]
         current_group.append(first_user)
         available_users.remove(first_user)
+        # Running sum of scores with the current members, per user (members added in order)
+        group_total = scores[:, pos[first_user]].copy()
         
         # Find most compatible users for the group
         while len(current_group) < group_size and available_users:
-            best_avg_score = -1
-            best_user = None
-            
-            # For each remaining user, calculate average compatibility with current group
-            for candidate in available_users:
-                total_score = 0
-                for group_member in current_group:
-                    score = matcher.get_compatibility_score(
-                        user_data[candidate], 
-                        user_data[group_member]
-                    )
-                    total_score += score
-                avg_score = total_score / len(current_group)
-                
-                if avg_score > best_avg_score:
-                    best_avg_score = avg_score
-                    best_user = candidate
+            # Average compatibility with the current group; first best in available order wins
+            candidates = np.array([pos[u] for u in available_users])
+            avg_scores = group_total[candidates] / len(current_group)
+            best_user = available_users[int(avg_scores.argmax())] if avg_scores.max() > -1 else None
             
             if best_user:
                 current_group.append(best_user)
                 available_users.remove(best_user)
+                group_total += scores[:, pos[best_user]]
         
         groups.append(current_group)
     
@@ -123,14 +214,7 @@ def create_groups(matcher, user_data, group_size=8):
                 best_group_idx = 0
                 
                 for i, group in enumerate(groups):
-                    total_score = 0
-                    for group_member in group:
-                        score = matcher.get_compatibility_score(
-                            user_data[user], 
-                            user_data[group_member]
-                        )
-                        total_score += score
-                    avg_score = total_score / len(group)
+                    avg_score = _sequential_sum(scores[pos[user], [pos[m] for m in group]]) / len(group)
                     
                     if avg_score > best_group_score:
                         best_group_score = best_group_score
@@ -143,37 +227,39 @@ def create_groups(matcher, user_data, group_size=8):
     
     return groups
 
+def _sequential_sum(values):
+    """Left-to-right float sum (same rounding as accumulating in a loop)"""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
 def print_groups(groups, matcher, user_data):
     """Print groups and their internal compatibility scores"""
+    scores = matcher.compatibility_matrix()
     print("\n=== Group Assignments ===")
     
     for i, group in enumerate(groups, 1):
         print(f"\nGroup {i} (Size: {len(group)}):")
         print("Members:", ", ".join(group))
         
-        # Calculate and print average group compatibility
-        total_score = 0
-        num_pairs = 0
-        for j, user1 in enumerate(group):
-            for user2 in group[j+1:]:
-                score = matcher.get_compatibility_score(
-                    user_data[user1],
-                    user_data[user2]
-                )
-                total_score += score
-                num_pairs += 1
+        # Average compatibility over every pair in the group, read from the matrix
+        members = [matcher.positions[u] for u in group]
+        upper = np.triu_indices(len(members), k=1)
+        pair_scores = scores[np.ix_(members, members)][upper]
         
-        avg_compatibility = total_score / num_pairs if num_pairs > 0 else 0
+        avg_compatibility = _sequential_sum(pair_scores) / len(pair_scores) if len(pair_scores) > 0 else 0
         print(f"Average Group Compatibility: {avg_compatibility:.2f}")
         print("-" * 40)
 
 # Modify the main function to include group creation
 def main():
+    parser = argparse.ArgumentParser(description="Questionnaire matching")
+    parser.add_argument('--verbose', action='store_true', help="Log every pair compared while finding top matches")
+    args = parser.parse_args()
+
     # Load user data
     user_data = load_user_data('responses.json')
     
     # Create matcher instance
-    matcher = Matcher(user_data)
+    matcher = Matcher(user_data, verbose=args.verbose)
     
     # Print individual matches
     print("=== Individual User Matches ===")
@@ -187,6 +273,7 @@ def main():
     # Create and print groups
     groups = create_groups(matcher, user_data, group_size=8)
     print_groups(groups, matcher, user_data)
+    matcher.sentiment.save()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,51 +1,151 @@
-import pandas as pd
+import argparse
+import csv
 import glob
+import hashlib
+import io
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_FILE = 'merge_manifest.json'
+
+def load_manifest(manifest_file):
+    """
+    {'files': {name: {'size', 'mtime_ns', 'sha256', 'user_id'}}, 'next_user': int}
+    """
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r') as f:
+            return json.load(f)
+    return {'files': {}, 'next_user': 1}
+
+def save_manifest(manifest, manifest_file):
+    tmp = f"{manifest_file}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_file)
+
+def parse_preference_file(path):
+    """
+    Reads one submission (Question,Answer rows) with the csv module.
+    Returns (path, stat, sha256, [(question, answer)]).
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig')))
+    rows = [(row['Question'], row.get('Answer') or '') for row in reader if row.get('Question')]
+    return path, stat, hashlib.sha256(data).hexdigest(), rows
+
+def read_header(output_file):
+    with open(output_file, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+def merge_preference_files(pattern='preferences_*.csv', output_file='merged_preferences.csv',
+                           manifest_file=MANIFEST_FILE, workers=8, cleanup='ask'):
+    """
+    Merges new preference_*.csv submissions into output_file.
+
+    A manifest remembers every merged file (size, mtime, content hash and its user ID), so
+    reruns only read new or modified files, user IDs never change, and new users are appended
+    to the existing output. New files get IDs in file-name order. A modified file replaces its
+    user's rows under the same ID; the output is only rewritten when that happens or when a new
+    question widens the header.
+
+    Each submission becomes one row per answer with the answer in its question's column,
+    the same layout as the earlier pivot-based merge.
+    """
+    csv_files = sorted(glob.glob(pattern))
 
-def merge_preference_files():
-    # Get all CSV files that start with 'preferences_'
-    csv_files = glob.glob('preferences_*.csv')
-    
     if not csv_files:
         print("No preference CSV files found!")
         return
-    
-    # Initialize list to store all dataframes
-    all_users = []
-    
-    # Process each CSV file
-    for i, file in enumerate(csv_files, 1):
-        # Read the CSV file
-        df = pd.read_csv(file)
-        
-        # Pivot the dataframe to convert questions to columns
-        user_df = df.pivot(columns='Question', values='Answer')
-        
-        # Add user ID
-        user_df['User_ID'] = f'User_{i}'
-        
-        # Reorder columns to put User_ID first
-        cols = ['User_ID'] + [col for col in user_df.columns if col != 'User_ID']
-        user_df = user_df[cols]
-        
-        all_users.append(user_df)
-    
-    # Combine all user dataframes
-    merged_df = pd.concat(all_users, ignore_index=True)
-    
-    # Save to new CSV file
-    output_file = 'merged_preferences.csv'
-    merged_df.to_csv(output_file, index=False)
-    
-    print(f"Successfully merged {len(csv_files)} files into {output_file}")
-    print(f"Total users processed: {len(merged_df)}")
-    
-    # Optionally, clean up individual files
-    cleanup = input("Do you want to delete individual preference files? (y/n): ").lower()
-    if cleanup == 'y':
-        for file in csv_files:
+
+    manifest = load_manifest(manifest_file)
+    if not os.path.exists(output_file):
+        manifest = {'files': {}, 'next_user': 1} # Output gone: start over
+    known = manifest['files']
+
+    # Size + mtime decide which files need reading at all; the hash decides if they really changed
+    to_read = []
+    for path in csv_files:
+        entry = known.get(path)
+        if entry is None:
+            to_read.append(path)
+        else:
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) != (entry['size'], entry['mtime_ns']):
+                to_read.append(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(parse_preference_file, to_read))
+
+    added, changed = [], []
+    for path, stat, sha, rows in parsed:
+        entry = known.get(path)
+        if entry is None:
+            entry = {'user_id': f"User_{manifest['next_user']}"}
+            manifest['next_user'] += 1
+            added.append((entry['user_id'], rows))
+        elif entry['sha256'] != sha:
+            changed.append((entry['user_id'], rows))
+        entry.update({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha})
+        known[path] = entry
+
+    if not added and not changed:
+        save_manifest(manifest, manifest_file) # Refresh touched-but-identical files
+        print(f"No new preference files to merge ({len(known)} already merged)")
+        return
+
+    # Header: User_ID then every question seen, sorted (as the pivot produced)
+    header = read_header(output_file) if os.path.exists(output_file) else []
+    questions = set(header[1:])
+    for _, rows in added + changed:
+        questions.update(q for q, _ in rows)
+    new_header = ['User_ID'] + sorted(questions)
+
+    def user_rows(user_id, rows):
+        for question, answer in rows:
+            yield {'User_ID': user_id, question: answer}
+
+    changed_ids = {user_id for user_id, _ in changed}
+    if header == new_header and not changed_ids:
+        with open(output_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=new_header)
+            for user_id, rows in added:
+                writer.writerows(user_rows(user_id, rows))
+    else:
+        # Rewrite once: keep existing rows (minus modified users), then the new and modified users
+        tmp = f"{output_file}.tmp"
+        with open(tmp, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=new_header)
+            writer.writeheader()
+            if header:
+                with open(output_file, 'r', newline='', encoding='utf-8') as f:
+                    writer.writerows(row for row in csv.DictReader(f) if row['User_ID'] not in changed_ids)
+            for user_id, rows in sorted(changed, key=lambda c: int(c[0].split('_')[1])) + added:
+                writer.writerows(user_rows(user_id, rows))
+        os.replace(tmp, output_file)
+    save_manifest(manifest, manifest_file)
+
+    print(f"Successfully merged {len(added)} new and {len(changed)} modified files into {output_file}")
+    print(f"Total users processed: {len(known)}")
+
+    # Optionally, clean up individual files (the manifest keeps their user IDs)
+    merged_files = [path for path, _, _, _ in parsed]
+    if cleanup == 'ask':
+        cleanup = 'yes' if input("Do you want to delete individual preference files? (y/n): ").lower() == 'y' else 'no'
+    if cleanup == 'yes':
+        for file in merged_files:
             os.remove(file)
         print("Individual preference files deleted.")
 
 if __name__ == "__main__":
-    merge_preference_files()
+    parser = argparse.ArgumentParser(description="Merge preferences_*.csv submissions")
+    parser.add_argument('--pattern', default='preferences_*.csv')
+    parser.add_argument('--output', default='merged_preferences.csv')
+    parser.add_argument('--manifest', default=MANIFEST_FILE)
+    parser.add_argument('--workers', type=int, default=8, help="Threads parsing new files (default: %(default)s)")
+    parser.add_argument('--cleanup', choices=['ask', 'yes', 'no'], default='ask', help="Delete merged submission files afterwards (default: %(default)s)")
+    args = parser.parse_args()
+
+    merge_preference_files(args.pattern, args.output, args.manifest, args.workers, args.cleanup)
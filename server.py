@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import io
+import threading
+import time
+from datetime import datetime
+
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+
+from smart_match import DataLoader, Matcher, MATCH_COLS
+
+# Local match service: loads the export once and keeps the encoded profiles, the top-k
+# index and the groups warm in memory.
+#
+#   python server.py --data data.csv --port 5000
+#
+#   GET  /match/<id>?k=5&mode=romantic|friend   best partners for one user
+#   GET  /group/<id>                            the group a user was placed in
+#   GET  /groups                                every group
+#   POST /reload                                rebuild in the background (old index keeps serving)
+#   GET  /health                                profile count, load time, reload state
+
+MAX_K = 100
+MODES = ("romantic", "friend")
+
+
+class MatchIndex:
+    """
+    Immutable snapshot of everything a lookup needs. Built off the request path and swapped
+    in whole, so requests never see a half-built index.
+    """
+    def __init__(self, data_path, snapshot_dir=None):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # Loader / matcher progress prints
+            df = DataLoader(data_path).load_and_clean(columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+            self.matcher = Matcher(df)
+            self.matcher.build_top_k_index(MODES)
+            self.groups = self.matcher.find_groups()
+        self.group_of = {uid: i for i, group in enumerate(self.groups) for uid in group}
+        self.names = df['name'].tolist()
+        self.years = df['year'].tolist()
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.build_seconds = round(time.perf_counter() - started, 3)
+
+    def lookup(self, raw_id):
+        """
+        Resolves a URL id to a profile id, or None if unknown.
+        """
+        for uid in (raw_id, int(raw_id) if raw_id.lstrip('-').isdigit() else None):
+            if uid is not None and uid in self.matcher.positions:
+                return uid
+        return None
+
+    def profile(self, uid):
+        pos = self.matcher.positions[uid]
+        year = self.years[pos]
+        return {'id': uid, 'name': self.names[pos], 'year': None if year != year else int(year)}
+
+
+class MatchService:
+    def __init__(self, data_path, snapshot_dir=None):
+        self.data_path = data_path
+        self.snapshot_dir = snapshot_dir
+        self.index = MatchIndex(data_path, snapshot_dir)
+        self.reload_error = None
+        self._reload_lock = threading.Lock()
+
+    @property
+    def reloading(self):
+        return self._reload_lock.locked()
+
+    def start_reload(self):
+        """
+        Rebuilds the index in a background thread; returns False if a reload is already running.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(target=self._reload, daemon=True)
+        thread.start()
+        return True
+
+    def _reload(self):
+        try:
+            index = MatchIndex(self.data_path, self.snapshot_dir)
+            self.index = index # Single reference swap; in-flight requests keep the old index
+            self.reload_error = None
+        except Exception as exc: # Keep serving the old index
+            self.reload_error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self._reload_lock.release()
+
+
+def create_app(data_path='data.csv', snapshot_dir=None):
+    app = Flask(__name__)
+    CORS(app)
+    service = MatchService(data_path, snapshot_dir)
+    app.config['MATCH_SERVICE'] = service
+
+    def error(message, status):
+        return jsonify({'error': message}), status
+
+    @app.get('/match/<user_id>')
+    def match(user_id):
+        index = service.index
+        uid = index.lookup(user_id)
+        if uid is None:
+            return error(f"Unknown id {user_id}", 404)
+        mode = request.args.get('mode', 'romantic')
+        if mode not in MODES:
+            return error(f"mode must be one of {', '.join(MODES)}", 400)
+        try:
+            k = int(request.args.get('k', 5))
+        except ValueError:
+            return error("k must be an integer", 400)
+        if not 1 <= k <= MAX_K:
+            return error(f"k must be between 1 and {MAX_K}", 400)
+
+        matches = [dict(index.profile(other), score=score) for other, score in index.matcher.top_k(uid, k, mode)]
+        return jsonify({'user': index.profile(uid), 'mode': mode, 'k': k, 'matches': matches})
+
+    @app.get('/group/<user_id>')
+    def group(user_id):
+        index = service.index
+        uid = index.lookup(user_id)
+        if uid is None:
+            return error(f"Unknown id {user_id}", 404)
+        number = index.group_of[uid]
+        return jsonify({'user': index.profile(uid), 'group': number + 1,
+                        'members': [index.profile(m) for m in index.groups[number]]})
+
+    @app.get('/groups')
+    def groups():
+        index = service.index
+        return jsonify({'groups': [{'group': i + 1, 'members': [index.profile(m) for m in members]}
+                                   for i, members in enumerate(index.groups)]})
+
+    @app.post('/reload')
+    def reload():
+        if not service.start_reload():
+            return jsonify({'status': 'already reloading'}), 409
+        return jsonify({'status': 'reloading'}), 202
+
+    @app.get('/health')
+    def health():
+        index = service.index
+        return jsonify({'profiles': len(index.matcher.ids), 'loaded_at': index.loaded_at,
+                        'build_seconds': index.build_seconds, 'reloading': service.reloading,
+                        'reload_error': service.reload_error})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match lookup service")
+    parser.add_argument('--data', default='data.csv', help="Form export to serve (default: %(default)s)")
+    parser.add_argument('--snapshot-dir', help="Directory for a binary snapshot of the cleaned export")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app(args.data, args.snapshot_dir)
+    print(f"Serving {len(app.config['MATCH_SERVICE'].index.matcher.ids)} profiles on http://{args.host}:{args.port}")
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -1,9 +1,42 @@
-import json
-import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import csv
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Synthetic respondents for load tests, in either input format of the pipeline:
+#
+#   python simulate.py --users 40                                   # questionnaire long format (merged_preferences.csv)
+#   python simulate.py --format form --users 1000000 --output big.csv   # data.csv form schema for smart_match.py
+#
+# Answers are drawn a whole column at a time from a seeded NumPy generator and written
+# chunk by chunk, so memory stays constant in --users. The same seed and --chunk-users give
+# the same file.
+
+CHUNK_USERS = 50000
+
+
+def csv_field(value):
+    """
+    One value rendered as a CSV field (quoted only when needed); missing values become empty.
+    """
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow([value])
+    return buffer.getvalue()
+
 
 class UserSimulator:
-    def __init__(self):
+    """
+    Questionnaire answers in the merged long format: one row per (user, question) with the
+    answer in that question's column, as merge.py writes it.
+    """
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
         # Define all possible responses for each question
         self.responses = {
             "What is your favorite book genre?": [
@@ -38,48 +71,102 @@ class UserSimulator:
                 "Beyoncé", "Lady Gaga", "Eminem", "Coldplay", "The Weeknd"
             ]
         }
+        self.questions = list(self.responses)
+        # Everything after "User_<n>" on a row is fixed per (question, option): render it once
+        width = len(self.questions)
+        self._tails = [
+            np.array(["," * (j + 1) + csv_field(option) + "," * (width - j - 1) + "\n" for option in options], dtype=object)
+            for j, options in enumerate(self.responses.values())
+        ]
+
+    def header(self):
+        return ",".join(csv_field(c) for c in ['User_ID'] + self.questions) + "\n"
 
     def generate_user_preferences(self, user_id):
         """Generate preferences for a single user"""
-        preferences = []
-        
-        # Generate one response for each question
-        for question, options in self.responses.items():
-            preferences.append({
-                'User_ID': f'User_{user_id}',
-                question: random.choice(options)
-            })
-        
-        return preferences
-
-def simulate_users(num_users=40):
+        return [{'User_ID': f'User_{user_id}', question: options[self.rng.integers(len(options))]}
+                for question, options in self.responses.items()]
+
+    def chunk(self, start, n):
+        """
+        CSV text for users start .. start+n-1, each user's rows contiguous and in question order.
+        """
+        # One draw per question column, then interleave: row i*Q + j is user i, question j
+        tails = np.empty((n, len(self.questions)), dtype=object)
+        for j, options in enumerate(self._tails):
+            tails[:, j] = options[self.rng.integers(0, len(options), n)]
+        prefixes = np.repeat(np.array([f"User_{i}" for i in range(start, start + n)], dtype=object), len(self.questions))
+        return "".join(prefixes + tails.ravel())
+
+
+class FormSimulator:
+    """
+    Respondents in the data.csv form schema that smart_match.DataLoader reads. Each column is
+    sampled independently from its empirical answer distribution in the source export;
+    name, email and phone are generated so they stay unique.
+    """
+    GENERATED = { # Never need CSV quoting
+        "Name (First + Last)": lambda i: f"Person {i}",
+        "Student Email": lambda i: f"p{i}@example.edu",
+        "Phone Number": lambda i: f"555{i:07d}",
+    }
+
+    def __init__(self, source='data.csv', seed=None):
+        self.rng = np.random.default_rng(seed)
+        source_df = pd.read_csv(source, dtype=object, keep_default_na=False)
+        self.columns = list(source_df.columns)
+        self._fields = {}
+        self._probs = {}
+        for col in self.columns:
+            if col in self.GENERATED:
+                continue
+            counts = source_df[col].value_counts(sort=False)
+            self._fields[col] = np.array([csv_field(v) for v in counts.index], dtype=object)
+            self._probs[col] = counts.to_numpy(dtype=np.float64) / counts.sum()
+
+    def header(self):
+        return ",".join(csv_field(c) for c in self.columns) + "\n"
+
+    def chunk(self, start, n):
+        ids = range(start, start + n)
+        columns = []
+        for col in self.columns:
+            if col in self.GENERATED:
+                make = self.GENERATED[col]
+                columns.append([make(i) for i in ids])
+            else:
+                fields = self._fields[col]
+                columns.append(fields[self.rng.choice(len(fields), n, p=self._probs[col])])
+        return "".join(",".join(row) + "\n" for row in zip(*columns))
+
+
+def simulate_users(num_users=40, output_file='merged_preferences.csv', fmt='long', seed=None,
+                   source='data.csv', chunk_users=CHUNK_USERS):
     print(f"Starting simulation of {num_users} users...")
-    simulator = UserSimulator()
-    all_preferences = []
-    
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=min(num_users, 10)) as executor:
-        # Submit all tasks
-        future_to_user = {
-            executor.submit(simulator.generate_user_preferences, i+1): i+1 
-            for i in range(num_users)
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_user):
-            user_id = future_to_user[future]
-            try:
-                preferences = future.result()
-                all_preferences.extend(preferences)
-                print(f"Simulated user {user_id}/{num_users}")
-            except Exception as e:
-                print(f"Error simulating user {user_id}: {str(e)}")
-    
-    # Convert to DataFrame and save to CSV
-    import pandas as pd
-    df = pd.DataFrame(all_preferences)
-    df.to_csv('merged_preferences.csv', index=False)
-    print("Simulation complete! Data saved to merged_preferences.csv")
+    started = time.perf_counter()
+    simulator = FormSimulator(source, seed) if fmt == 'form' else UserSimulator(seed)
+
+    tmp = f"{output_file}.tmp"
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(simulator.header())
+        for start in range(0, num_users, chunk_users):
+            n = min(chunk_users, num_users - start)
+            f.write(simulator.chunk(start + 1, n))
+    os.replace(tmp, output_file)
+
+    print(f"Simulation complete! {num_users} users saved to {output_file} in {time.perf_counter() - started:.2f}s")
+
 
 if __name__ == "__main__":
-    simulate_users(40)
+    parser = argparse.ArgumentParser(description="Generate synthetic respondents")
+    parser.add_argument('--users', type=int, default=40)
+    parser.add_argument('--format', choices=['long', 'form'], default='long',
+                        help="long: questionnaire rows as merge.py writes them; form: the data.csv export schema (default: %(default)s)")
+    parser.add_argument('--output', help="Output CSV (default: merged_preferences.csv for long, simulated_data.csv for form)")
+    parser.add_argument('--source', default='data.csv', help="Export whose answer distributions the form format samples (default: %(default)s)")
+    parser.add_argument('--seed', type=int, help="RNG seed; the same seed reproduces the same file")
+    parser.add_argument('--chunk-users', type=int, default=CHUNK_USERS, help="Users generated and written per chunk (default: %(default)s)")
+    args = parser.parse_args()
+
+    output = args.output or ('simulated_data.csv' if args.format == 'form' else 'merged_preferences.csv')
+    simulate_users(args.users, output, args.format, args.seed, args.source, args.chunk_users)
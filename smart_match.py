@@ -1,13 +1,26 @@
 import pandas as pd
 import numpy as np
+import io
+import csv
 import json
+import os
+import sys
+import time
+import contextlib
+import functools
+import hashlib
+import itertools
 import argparse
+import multiprocessing
+from multiprocessing import shared_memory
 from datetime import datetime
 
 class DataLoader:
     def __init__(self, filepath):
         self.filepath = filepath
         self.df = None
+        self.checkpoint = None # Follow state of the last load_and_clean / poll (JSON-serializable)
+        self._load_args = (None, None)
         self.column_map = {
             "Timestamp": "timestamp",
             "Name (First + Last)": "name",
@@ -42,26 +55,1446 @@ class DataLoader:
             "Would you be interested in participating in pop the balloon at this event?": "pop_balloon"
         }
 
-    def load_and_clean(self):
-        self.df = pd.read_csv(self.filepath)
-        self.df = self.df.rename(columns=self.column_map)
+    def load_and_clean(self, columns=None, snapshot_dir=None):
+        """
+        Reads the form export and cleans it.
+        `columns` (cleaned names, e.g. MATCH_COLS) projects the read down to those columns and parses
+        enumerated answers straight into categoricals. With `snapshot_dir`, the cleaned frame is saved
+        as a compact .npz keyed by the export's content hash and mtime, and reloaded from it while the
+        export is unchanged. Also records the checkpoint poll() follows the export from.
+        """
+        self._load_args = (columns, snapshot_dir)
+        if snapshot_dir:
+            path, key = self._snapshot_path(snapshot_dir, columns)
+            if os.path.exists(path):
+                self.df, self.checkpoint = self._read_snapshot(path)
+                print(f"Loaded {len(self.df)} profiles.")
+                return self.df
+
+        with open(self.filepath, 'rb') as f:
+            data = f.read()
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        self.df, timestamps = self._parse(data, columns)
+        self.checkpoint = self._new_checkpoint(data, mtime_ns, len(self.df), timestamps)
+
+        if snapshot_dir:
+            self._write_snapshot(path, key)
+            
+        print(f"Loaded {len(self.df)} profiles.")
+        return self.df
+
+    def _parse(self, data, columns=None):
+        """
+        Cleaned frame of the CSV bytes `data`, plus their raw Timestamp column (None if absent).
+        """
+        if columns is None:
+            df = pd.read_csv(io.BytesIO(data))
+        else:
+            source = {clean: raw for raw, clean in self.column_map.items()}
+            wanted = {source[c] for c in columns} | {"Timestamp"}
+            dtypes = {source[c]: 'category' for c in columns if c in CATEGORICAL_COLS}
+            df = pd.read_csv(io.BytesIO(data), usecols=lambda c: c in wanted, dtype=dtypes)
+        timestamps = df["Timestamp"] if "Timestamp" in df else None
+        df = df.rename(columns=self.column_map)
+        if columns is not None:
+            df = df[list(columns)] # usecols keeps file order
         
         # Clean Year
-        self.df['year'] = pd.to_numeric(self.df['year'], errors='coerce')
+        df['year'] = pd.to_numeric(df['year'], errors='coerce')
         
         # Clean Stats (ensure they are numeric)
         stat_cols = ['stat_trust', 'stat_humor', 'stat_communication', 'stat_kindness', 'stat_looks', 'stat_money', 'stat_ambition']
         for col in stat_cols:
-            self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(3) # Default to 3 if missing
-            
-        print(f"Loaded {len(self.df)} profiles.")
-        return self.df
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(3) # Default to 3 if missing
+        return df, timestamps
+
+    # --- Follow mode ---
+    def poll(self):
+        """
+        Follow mode: the cleaned rows appended to the export since the last load_and_clean / poll,
+        as (rows, reloaded). Only the new bytes are read and parsed, with the same projection and
+        cleaning as the last load; ids continue after the rows already seen, so `rows` can go
+        straight to Matcher.add_profiles. A record still being written is left for the next poll.
+
+        If the export was truncated or rewritten (its header and first rows or the bytes just before
+        the checkpoint changed, the last row read was extended, or new Timestamps go backwards),
+        falls back to a full load_and_clean: `rows` is then the whole export and `reloaded` is True.
+        An unchanged file costs one os.stat.
+        """
+        columns, snapshot_dir = self._load_args
+        checkpoint = self.checkpoint
+        if checkpoint is None:
+            return self.load_and_clean(columns, snapshot_dir), True
+        empty = self.df.iloc[:0]
+        stat = os.stat(self.filepath)
+        if stat.st_size == checkpoint['size'] and stat.st_mtime_ns == checkpoint['mtime_ns']:
+            return empty, False
+        if stat.st_size < checkpoint['offset']:
+            return self._reload("truncated")
+
+        offset = checkpoint['offset']
+        with open(self.filepath, 'rb') as f:
+            head = f.read(checkpoint['head_length'])
+            f.seek(max(0, offset - FOLLOW_TAIL_BYTES))
+            tail = f.read(offset - max(0, offset - FOLLOW_TAIL_BYTES))
+            appended = f.read()
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        if _digest(head) != checkpoint['head'] or _digest(tail) != checkpoint['tail']:
+            return self._reload("rewritten")
+        # New records start after the line break ending the last record read
+        skip = next((len(eol) for eol in (b'\r\n', b'\n') if appended.startswith(eol)), 0)
+        if not skip and appended not in (b'', b'\r'):
+            return self._reload("rewritten (its last row changed)")
+        body = appended[skip:]
+
+        end = _complete_records(body, checkpoint['fields'])
+        checkpoint.update(size=offset + len(appended), mtime_ns=mtime_ns)
+        if not end:
+            return empty, False
+        rows, timestamps = self._parse(head[:checkpoint['header_length']] + b'\n' + body[:end], columns)
+        times = _parse_timestamps(timestamps)
+        last = checkpoint['last_timestamp']
+        if last is not None and len(times) and times.min() < pd.Timestamp(last):
+            return self._reload("rewritten (Timestamps went backwards)")
+
+        rows.index = pd.RangeIndex(checkpoint['rows'], checkpoint['rows'] + len(rows))
+        consumed = tail + appended[:skip + end]
+        checkpoint.update(offset=offset + len(consumed) - len(tail),
+                          tail=_digest(consumed[-FOLLOW_TAIL_BYTES:]),
+                          rows=checkpoint['rows'] + len(rows),
+                          last_timestamp=_last_timestamp(times) or last)
+        return rows, False
+
+    def _reload(self, reason):
+        print(f"{self.filepath} was {reason}; reloading it in full.")
+        columns, snapshot_dir = self._load_args
+        return self.load_and_clean(columns, snapshot_dir), True
+
+    def _new_checkpoint(self, data, mtime_ns, rows, timestamps):
+        header_length = _record_end(data, 0)
+        offset = len(data.rstrip(b'\r\n'))
+        return {
+            'offset': offset, # End of the last record read (before its line break)
+            'size': len(data),
+            'mtime_ns': mtime_ns,
+            'header_length': header_length,
+            'head_length': min(offset, header_length + FOLLOW_TAIL_BYTES),
+            'head': _digest(data[:min(offset, header_length + FOLLOW_TAIL_BYTES)]),
+            'fields': len(next(csv.reader([data[:header_length].decode('utf-8', 'replace')]), [])),
+            'tail': _digest(data[max(0, offset - FOLLOW_TAIL_BYTES):offset]),
+            'rows': rows,
+            'last_timestamp': _last_timestamp(_parse_timestamps(timestamps)),
+        }
+
+    def _snapshot_path(self, snapshot_dir, columns):
+        stat = os.stat(self.filepath)
+        digest = hashlib.sha256(f"{SNAPSHOT_VERSION}:{stat.st_mtime_ns}:{columns}".encode())
+        with open(self.filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        key = digest.hexdigest()[:20]
+        name = os.path.splitext(os.path.basename(self.filepath))[0]
+        return os.path.join(snapshot_dir, f"{name}_{key}.npz"), key
+
+    def _write_snapshot(self, path, key):
+        # Numeric columns keep their dtype; text columns as int32 codes into a fixed-width string table
+        arrays = {'__columns__': np.array(self.df.columns.tolist()), '__index__': self.df.index.to_numpy(dtype=np.int64),
+                  '__key__': np.array(key), '__checkpoint__': np.array(json.dumps(self.checkpoint))}
+        for i, col in enumerate(self.df.columns):
+            values = self.df[col]
+            if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+                arrays[f"num_{i}"] = values.to_numpy()
+            else:
+                codes, categories = pd.factorize(values.astype(object))
+                arrays[f"codes_{i}"] = codes.astype(np.int32)
+                arrays[f"categories_{i}"] = np.array([str(c) for c in categories], dtype=str)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    def _read_snapshot(self, path):
+        with np.load(path) as snap:
+            data = {}
+            for i, col in enumerate(snap['__columns__'].tolist()):
+                if f"num_{i}" in snap:
+                    data[col] = snap[f"num_{i}"]
+                else:
+                    values = pd.Categorical.from_codes(snap[f"codes_{i}"], snap[f"categories_{i}"].astype(object))
+                    data[col] = values if col in CATEGORICAL_COLS else np.asarray(values.astype(object))
+            return pd.DataFrame(data, index=pd.Index(snap['__index__'])), json.loads(str(snap['__checkpoint__']))
+
+# Google Forms export timestamps; rows that do not parse are ignored by the monotonicity check
+TIMESTAMP_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Bytes after the header and before the follow checkpoint that must be unchanged for an export
+# to count as appended to
+FOLLOW_TAIL_BYTES = 4096
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _parse_timestamps(timestamps):
+    if timestamps is None:
+        return pd.Series([], dtype='datetime64[ns]')
+    return pd.to_datetime(timestamps.astype(object), format=TIMESTAMP_FORMAT, errors='coerce').dropna()
+
+
+def _last_timestamp(times):
+    return times.max().isoformat() if len(times) else None
+
+
+def _record_end(data, start):
+    """
+    Position of the line break ending the CSV record that starts at `start` (line breaks inside
+    quoted fields do not count), excluding a preceding carriage return; len(data) if unterminated.
+    """
+    pos = data.find(b'\n', start)
+    while pos != -1 and data.count(b'"', start, pos) % 2:
+        pos = data.find(b'\n', pos + 1)
+    if pos == -1:
+        return len(data)
+    return pos - 1 if pos > start and data[pos - 1:pos] == b'\r' else pos
+
+
+def _complete_records(data, fields):
+    """
+    Length of the longest prefix of `data` (CSV starting at a record boundary) that holds whole
+    records. An unterminated last record counts when its quotes are balanced and it has all
+    `fields` fields (if it is later extended, the follower notices and reloads).
+    """
+    start = end = 0
+    while start < len(data):
+        stop = _record_end(data, start)
+        if stop == len(data):
+            record = data[start:]
+            if record.count(b'"') % 2 == 0 and len(next(csv.reader([record.decode('utf-8', 'replace')]), [])) == fields:
+                end = len(data)
+            break
+        end = stop
+        start = data.index(b'\n', stop) + 1
+    return end
+
+
+STAT_COLS = ['stat_trust', 'stat_humor', 'stat_communication', 'stat_kindness', 'stat_looks', 'stat_money', 'stat_ambition']
+CORE_STAT_COLS = ['stat_trust', 'stat_communication', 'stat_kindness']
+
+# Every cleaned column calculate_score reads; the on-disk score cache is keyed by their content
+SCORED_COLS = ['year', 'gender', 'orientation', 'similar_preference', 'music', 'weekend',
+               'love_language', 'politics', 'politics_preference', 'smoking'] + STAT_COLS
+
+# Enumerated answers loaded as pandas categoricals on the projected load path
+CATEGORICAL_COLS = ['gender', 'orientation', 'similar_preference', 'music', 'weekend',
+                    'love_language', 'politics', 'politics_preference', 'smoking']
+
+# What matching and reports read: the scored columns plus display names
+MATCH_COLS = ['name'] + SCORED_COLS
+
+# Bump whenever the snapshot layout or cleaning rules change
+SNAPSHOT_VERSION = 2
+
+# Bump whenever scoring rules or weights change, so cached score matrices are invalidated
+SCORING_VERSION = 1
+
+# Weights of calculate_score's terms and its normalization range. Override any of them with a
+# JSON file (--weights, load_weights); cached score matrices are keyed by the weights in use.
+DEFAULT_WEIGHTS = {
+    'politics_match': 10,                     # Same political views
+    'politics_mismatch_non_negotiable': -50,  # Different views when the asker's are non-negotiable
+    'smoking_conflict': -50,                  # Asker cares about smoking and the partner smokes
+    'music': 15,                              # Times the music Jaccard similarity
+    'weekend': 15,                            # Times the weekend Jaccard similarity
+    'core_stat': 5,                           # Times each trust / communication / kindness similarity
+    'soft_stat_similar': 3,                   # Times each other stat similarity, asker seeks similar
+    'soft_stat_other': 1,                     # ... asker open to different
+    'love_language': 10,                      # Same love language
+    'raw_min': -60,                           # Raw scores raw_min..raw_max map onto score_min..score_max
+    'raw_max': 90,
+    'score_min': 38.8,
+    'score_max': 98.6,
+}
+WEIGHT_KEYS = list(DEFAULT_WEIGHTS)
+TERM_WEIGHT_KEYS = WEIGHT_KEYS[:-4] # Everything but the normalization range
+
+# A raw score below this means hard-incompatible (see calculate_score)
+HARD_INCOMPATIBLE_RAW = -500
+
+
+def load_weights(source=None):
+    """
+    Scoring weights: DEFAULT_WEIGHTS updated from a dict or a JSON file path (None: defaults).
+    Raises ValueError for unknown keys, an empty normalization range, or penalties so large
+    that a soft score could pass for hard-incompatible.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            source = json.load(f)
+    weights = dict(DEFAULT_WEIGHTS)
+    unknown = set(source or {}) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weights: {sorted(unknown)}; expected some of {WEIGHT_KEYS}")
+    weights.update(source or {})
+    if not (weights['raw_max'] > weights['raw_min'] and weights['score_max'] > weights['score_min']):
+        raise ValueError("Normalization needs raw_max > raw_min and score_max > score_min")
+    worst = (min(weights['politics_match'], weights['politics_mismatch_non_negotiable'], 0)
+             + min(weights['smoking_conflict'], 0) + min(weights['music'], 0) + min(weights['weekend'], 0)
+             + len(CORE_STAT_COLS) * min(weights['core_stat'], 0)
+             + (len(STAT_COLS) - len(CORE_STAT_COLS)) * min(weights['soft_stat_similar'], weights['soft_stat_other'], 0)
+             + min(weights['love_language'], 0))
+    if worst <= HARD_INCOMPATIBLE_RAW:
+        raise ValueError(f"Penalties can reach a raw score of {worst}, which reads as hard-incompatible")
+    return weights
+
+
+def load_sweep(source):
+    """
+    Weight configurations for Matcher.sweep_weights, from a JSON file path or the parsed value:
+    a list of weight dicts, or a grid {key: [values]} expanded to every combination
+    ({"music": [10, 15, 20], "raw_min": [-60, -80]} is 6 configs). Each goes through load_weights.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as f:
+            source = json.load(f)
+    if isinstance(source, dict):
+        keys = list(source)
+        source = [dict(zip(keys, values)) for values in itertools.product(*(source[k] for k in keys))]
+    return [load_weights(config) for config in source]
+
+# --- Gender / Orientation Categories ---
+# Each profile is reduced to a small integer code: gender * len(ORIENTATION_CATEGORIES) + orientation
+GENDER_CATEGORIES = ['Man', 'Woman', 'NB']
+ORIENTATION_CATEGORIES = ['Straight', 'Gay', 'Bi']
+
+# Allowed romantic pairings of (Gender, Orientation), direction agnostic
+ALLOWED_ORIENTATION_PAIRS = [
+    (('Man', 'Straight'), ('Woman', 'Straight')),  # 1. straight man + straight women
+    (('Man', 'Bi'), ('Woman', 'Straight')),        # 2. bi men + straight women
+    (('Man', 'Bi'), ('Man', 'Bi')),                # 3. bi men + bi men
+    (('Man', 'Bi'), ('Woman', 'Bi')),              # 4. bi men + bi women
+    (('Man', 'Gay'), ('Man', 'Bi')),               # 5. gay men + bi men
+    (('Man', 'Gay'), ('Man', 'Gay')),              # 6. gay men + gay men
+    (('Woman', 'Bi'), ('Man', 'Straight')),        # 7. bi women + straight men
+    (('Woman', 'Bi'), ('Woman', 'Bi')),            # 8. bi women + bi women
+    (('Woman', 'Gay'), ('Woman', 'Bi')),           # 9. gay women + bi women
+    (('Woman', 'Gay'), ('Woman', 'Gay')),          # 10. gay women + gay women
+]
+
+
+def profile_code(gender, orientation):
+    return GENDER_CATEGORIES.index(gender) * len(ORIENTATION_CATEGORIES) + ORIENTATION_CATEGORIES.index(orientation)
+
+
+def _compile_orientation_table():
+    """
+    Compiles the allow-list (plus the NB rules) into a symmetric boolean lookup
+    table indexed by [profile_code_a, profile_code_b].
+    """
+    profiles = [(g, o) for g in GENDER_CATEGORIES for o in ORIENTATION_CATEGORIES]
+    table = np.zeros((len(profiles), len(profiles)), dtype=bool)
+    for p_a, p_b in ALLOWED_ORIENTATION_PAIRS:
+        table[profile_code(*p_a), profile_code(*p_b)] = True
+        table[profile_code(*p_b), profile_code(*p_a)] = True
+
+    # Non-binary Logic (User approved plan for permissiveness)
+    for g_a, o_a in profiles:
+        for g_b, o_b in profiles:
+            # NB + NB matching (regardless of orientation)
+            # NB + Bi/Pan (Man or Woman): if one is NB, the other MUST be Bi (which includes Pan/Queer/Fluid)
+            if (g_a == 'NB' and g_b == 'NB') or (g_a == 'NB' and o_b == 'Bi') or (g_b == 'NB' and o_a == 'Bi'):
+                table[profile_code(g_a, o_a), profile_code(g_b, o_b)] = True
+    return table
+
+
+ORIENTATION_TABLE = _compile_orientation_table()
+
+# Rows per block when filling the N x N score array (bounds the temporaries)
+SCORE_BLOCK_ROWS = 512
+
+# float32 (config, pair) scores per block in weight sweeps (64 MB)
+SWEEP_BLOCK_ELEMENTS = 1 << 24
+
+# Columns scanned at a time when collecting near-tied partners in a sweep
+NEAR_TIE_CHUNK = 128
+
+# Codes for single-choice answers (politics, love language); only ever compared for equality
+CODE_DTYPE = np.int16
+
+
+def _multi_hot(values, vocab=None):
+    """
+    Encodes multi-select answers (", " separated) as bitsets over the vocabulary
+    of every option seen: a uint64 array of shape (N, words), plus the number of
+    options per row (uint8). Pass the same `vocab` dict to keep bit positions stable
+    across batches (new options are appended to it).
+    """
+    vocab = {} if vocab is None else vocab
+    token_sets = [set(str(v).split(', ')) for v in values]
+    masks = []
+    for tokens in token_sets:
+        mask = 0
+        for t in tokens:
+            mask |= 1 << vocab.setdefault(t, len(vocab))
+        masks.append(mask)
+    words = max((len(vocab) + 63) // 64, 1)
+    bits = np.array([[(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words)] for mask in masks],
+                    dtype=np.uint64).reshape(len(masks), words)
+    return bits, np.array([len(tokens) for tokens in token_sets], dtype=np.uint8)
+
+
+# Set bits per byte, for popcounts on NumPy versions without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+def _popcount(bits):
+    """
+    Number of set bits per row of a (pairs, words) uint64 array.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+    return _BYTE_POPCOUNT[bits.view(np.uint8)].sum(axis=1)
+
+
+class Profiler:
+    """
+    Per-phase wall times and counters for a matching run, as a JSON-ready summary.
+
+        profiler = Profiler()
+        matcher = Matcher(df, profiler=profiler)
+        matcher.find_ideal_matches()
+        print(profiler.to_json())
+
+    Counters: pairs_evaluated (soft-scored), pairs_rejected_grade / pairs_rejected_orientation
+    (by the hard constraints, including pairs pruned by blocking), group_slots /
+    group_candidates_scanned, and *_cache_hits / *_cache_misses.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def merge(self, counters):
+        for name, n in counters.items():
+            self.count(name, n)
+
+    def summary(self):
+        return {
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+
+class _NullProfiler:
+    """
+    Stand-in when profiling is off: every hook is a no-op, and the kernels skip
+    their counting entirely (they check `enabled` once per block).
+    """
+    enabled = False
+    _context = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def count(self, name, n=1):
+        pass
+
+    def merge(self, counters):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def _profiled(phase):
+    """
+    Times a Matcher method as `phase` on the matcher's profiler (phases may nest).
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _hard_compatible(feat, rows, cols, mode="romantic"):
+    """
+    Boolean block of the hard constraints: grade adjacency AND (romantic only) orientation.
+    """
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+
+    # 1. Grade Adjacency (permissive if missing)
+    year_a = feat['year'][rows][:, None]
+    year_b = feat['year'][cols][None, :]
+    compatible = np.isnan(year_a) | np.isnan(year_b) | (np.abs(year_a - year_b) <= 1)
+
+    # 2. Orientation (Only for Romantic)
+    if mode == "romantic":
+        compatible &= ORIENTATION_TABLE[feat['profile_code'][rows][:, None], feat['profile_code'][cols][None, :]]
+    return compatible
+
+
+def _score_block(feat, rows, cols, mode="romantic", profiler=NULL_PROFILER):
+    """
+    Vectorized calculate_score for every (row, col) pair of the encoded profiles.
+    Hard constraints are checked first; soft scoring only runs on the compatible
+    (row, col) pairs and every other entry is -1000.
+    """
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+
+    compatible = _hard_compatible(feat, rows, cols, mode)
+    block = np.full(compatible.shape, -1000.0)
+    pair_rows, pair_cols = np.nonzero(compatible)
+    if profiler.enabled:
+        rejected_grade = int((~_hard_compatible(feat, rows, cols, "friend")).sum())
+        profiler.count('pairs_evaluated', len(pair_rows))
+        profiler.count('pairs_rejected_grade', rejected_grade)
+        profiler.count('pairs_rejected_orientation', compatible.size - len(pair_rows) - rejected_grade)
+    if len(pair_rows):
+        block[pair_rows, pair_cols] = _soft_scores(feat, rows[pair_rows], cols[pair_cols])
+    return block
+
+
+def _pair_block(feat, rows, cols, mode="romantic", profiler=NULL_PROFILER):
+    """
+    Both directions of every (row, col) pair in one pass: (forward, backward) where
+    forward[i, j] == calculate_score(rows[i], cols[j]) and backward[i, j] == calculate_score(cols[j], rows[i]).
+    The hard constraints and the symmetric score components are computed once per pair.
+    """
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+
+    compatible = _hard_compatible(feat, rows, cols, mode) # Symmetric, so it holds both ways
+    forward = np.full(compatible.shape, -1000.0)
+    backward = np.full(compatible.shape, -1000.0)
+    pair_rows, pair_cols = np.nonzero(compatible)
+    if profiler.enabled: # Counted per direction, like two _score_block calls
+        rejected_grade = int((~_hard_compatible(feat, rows, cols, "friend")).sum())
+        profiler.count('pairs_evaluated', 2 * len(pair_rows))
+        profiler.count('pairs_rejected_grade', 2 * rejected_grade)
+        profiler.count('pairs_rejected_orientation', 2 * (compatible.size - len(pair_rows) - rejected_grade))
+    if len(pair_rows):
+        a, b = rows[pair_rows], cols[pair_cols]
+        shared = _pair_components(feat, a, b)
+        forward[pair_rows, pair_cols] = _directed_scores(feat, shared, a, b)
+        backward[pair_rows, pair_cols] = _directed_scores(feat, shared, b, a)
+    return forward, backward
+
+
+def _soft_scores(feat, a, b):
+    """
+    Normalized soft score of each pair (a[i], b[i]), ignoring hard constraints.
+    """
+    return _directed_scores(feat, _pair_components(feat, a, b), a, b)
+
+
+def _pair_components(feat, a, b):
+    """
+    The parts of the soft score that do not depend on direction, for each pair (a[i], b[i]):
+    politics / love language matches, multi-select (overlap, union) counts and absolute stat
+    differences. Only the asker's flags (politics non-negotiable, cares about smoking, seeks
+    similarity) make a score directional, and those are per-profile arrays in `feat`.
+    """
+    shared = {
+        'pol_match': feat['politics'][a] == feat['politics'][b],
+        'love_match': feat['love_language'][a] == feat['love_language'][b],
+        'stat_diff': np.abs(feat['stats'][a].astype(np.float64) - feat['stats'][b]),
+    }
+    # Interests (Music, Weekend) - Jaccard via popcount on the bitsets
+    for key in ('music', 'weekend'):
+        bits, count = feat[key]
+        overlap = _popcount(bits[a] & bits[b])
+        shared[key] = (overlap, count[a].astype(np.int64) + count[b] - overlap)
+    return shared
+
+
+# Raw score terms in the order calculate_score adds them
+SCORE_TERMS = ['politics', 'smoking', 'music', 'weekend'] + STAT_COLS + ['love_language']
+
+
+def _score_terms(feat, shared, a, b, w):
+    """
+    Raw score terms of a[i] towards b[i] (one array per SCORE_TERMS entry) from the shared
+    components, weighted by the dict `w`.
+    """
+    terms = []
+
+    # Politics
+    pol_match = shared['pol_match']
+    terms.append(np.where(feat['politics_nonneg'][a] & ~pol_match, float(w['politics_mismatch_non_negotiable']),
+                          np.where(pol_match, float(w['politics_match']), 0.0)))
+
+    # Smoking
+    terms.append(w['smoking_conflict'] * (feat['smoking_care'][a] & feat['smokes'][b]))
+
+    # Interests (Music, Weekend)
+    for key in ('music', 'weekend'):
+        overlap, union = shared[key]
+        terms.append(w[key] * (overlap / union))
+
+    # Stats
+    soft_weight = np.where(feat['seek_sim'][a], w['soft_stat_similar'], w['soft_stat_other'])
+    for k, col in enumerate(STAT_COLS):
+        similarity = 1.0 - shared['stat_diff'][:, k] / 4.0
+        terms.append((w['core_stat'] if col in CORE_STAT_COLS else soft_weight) * similarity)
+
+    # Love Language
+    terms.append(np.where(shared['love_match'], w['love_language'], 0))
+    return terms
+
+
+def _directed_scores(feat, shared, a, b, weights=None):
+    """
+    Normalized score of a[i] towards b[i] from the shared components, with `weights` (a dict as
+    from load_weights; default: the weights stored in `feat`). Terms are accumulated in the same
+    order as calculate_score so the results are bit-for-bit identical to the per-pair function.
+    """
+    w = _weights(feat) if weights is None else weights
+    terms = _score_terms(feat, shared, a, b, w)
+    score = terms[0]
+    for term in terms[1:]:
+        score += term
+
+    # --- Score Normalization (see calculate_score) ---
+    return _normalize(score, w)
+
+
+def _breakdown(feat, shared, a, b, w):
+    """
+    {term: contribution} of a towards b (single positions) plus 'raw' and the normalized 'score'.
+    """
+    terms = _score_terms(feat, shared, np.array([a]), np.array([b]), w)
+    breakdown = {name: float(term[0]) for name, term in zip(SCORE_TERMS, terms)}
+    raw = terms[0]
+    for term in terms[1:]:
+        raw += term
+    breakdown['raw'] = float(raw[0])
+    breakdown['score'] = float(_normalize(raw, w)[0])
+    return breakdown
+
+
+# Candidate partners kept per user for the sparse mutual-matching graph
+MUTUAL_CANDIDATES = 25
+
+# Edge bonus per earlier sit-out in schedule_rounds; above the whole 38.8-98.6 score range
+SIT_OUT_PRIORITY = 100.0
+
+# Rounds with at most this many candidate attendees are solved exactly (blossom); larger ones greedily
+EXACT_MATCHING_NODES = 150
+
+# Longest chain of partner swaps an augmenting path may make in _greedy_matching
+AUGMENT_DEPTH = 50
+
+
+class BlockingIndex:
+    """
+    Buckets profiles by (year, gender category, orientation category). The hard constraints
+    only depend on those three fields, so whether two buckets can interact is decided once per
+    bucket pair, and candidate generation only touches compatible buckets.
+    Missing years get their own bucket, which is compatible with every year (same as
+    get_grade_compatibility).
+    """
+    def __init__(self, features):
+        self.year = features['year']
+        self.profile_code = features['profile_code']
+        self.n = len(self.year)
+
+        # Group positions by (year, code) with one stable sort; buckets keep first-appearance order
+        year_key = np.where(np.isnan(self.year), -1, np.nan_to_num(self.year)).astype(np.int64)
+        combined = year_key * 16 + self.profile_code
+        order = np.argsort(combined, kind='stable')
+        uniq, starts = np.unique(combined[order], return_index=True)
+        groups = np.split(order.astype(np.intp), starts[1:]) if len(order) else []
+        self.buckets = {}
+        for group in sorted(groups, key=lambda g: g[0]):
+            self.buckets[self._key(self.year[group[0]], self.profile_code[group[0]])] = group
+
+        # Which bucket pairs can interact, per mode
+        self.compatible = {}
+        for mode in ("romantic", "friend"):
+            self.compatible[mode] = {
+                key_a: [key_b for key_b in self.buckets if self._buckets_compatible(key_a, key_b, mode)]
+                for key_a in self.buckets
+            }
+        self._candidates = {}
+
+    @staticmethod
+    def _key(year, code):
+        gender, orientation = divmod(code, len(ORIENTATION_CATEGORIES))
+        return (None if np.isnan(year) else int(year), GENDER_CATEGORIES[gender], ORIENTATION_CATEGORIES[orientation])
+
+    @staticmethod
+    def _buckets_compatible(key_a, key_b, mode):
+        year_a, gender_a, orientation_a = key_a
+        year_b, gender_b, orientation_b = key_b
+        if year_a is not None and year_b is not None and abs(year_a - year_b) > 1:
+            return False
+        if mode == "romantic":
+            return bool(ORIENTATION_TABLE[profile_code(gender_a, orientation_a), profile_code(gender_b, orientation_b)])
+        return True
+
+    def rejected(self, key, mode="romantic"):
+        """
+        (pairs rejected by grade, pairs rejected by orientation) for one row of bucket `key`
+        against every bucket it cannot interact with. Grade is checked first, as in calculate_score.
+        """
+        if (key, mode, 'rejected') not in self._candidates:
+            compatible = set(self.compatible[mode][key])
+            grade = orientation = 0
+            for other, bucket in self.buckets.items():
+                if other in compatible:
+                    continue
+                if self._buckets_compatible(key, other, "friend"):
+                    orientation += len(bucket)
+                else:
+                    grade += len(bucket)
+            self._candidates[(key, mode, 'rejected')] = (grade, orientation)
+        return self._candidates[(key, mode, 'rejected')]
+
+    def key_of(self, pos):
+        return self._key(self.year[pos], self.profile_code[pos])
+
+    def candidates(self, key, mode="romantic"):
+        """
+        Sorted positions of every profile in a bucket compatible with `key` (includes the bucket itself).
+        """
+        if (mode, key) not in self._candidates:
+            parts = [self.buckets[k] for k in self.compatible[mode][key]]
+            self._candidates[(mode, key)] = np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.intp)
+        return self._candidates[(mode, key)]
+
+    def stats(self, mode="romantic"):
+        """
+        How many directed pairs (excluding self-pairs) survive blocking.
+        """
+        total = self.n * (self.n - 1)
+        candidates = 0
+        for key, rows in self.buckets.items():
+            candidates += len(rows) * len(self.candidates(key, mode))
+            if key in self.compatible[mode][key]:
+                candidates -= len(rows) # Self-pairs
+        return {
+            'buckets': len(self.buckets),
+            'total_pairs': total,
+            'candidate_pairs': candidates,
+            'pruned_pairs': total - candidates,
+            'pruned_fraction': (total - candidates) / total if total else 0.0,
+        }
+
+
+def _normalize(score, w):
+    # Same mapping as calculate_score: raw_min..raw_max onto score_min..score_max, clamped
+    factor = (w['score_max'] - w['score_min']) / (w['raw_max'] - w['raw_min'])
+    return np.maximum(w['score_min'], np.minimum(w['score_min'] + (score - w['raw_min']) * factor, w['score_max']))
+
+
+def _weights(feat):
+    """
+    The scoring weights stored with the encoded profiles, as a dict.
+    """
+    return dict(zip(WEIGHT_KEYS, feat['weights'].tolist()))
+
+
+class StatIndex:
+    """
+    Grid over the integer 1-5 personality stat cube, per blocking bucket. Profiles that share
+    a stat vector (and politics, love language and smoking answers) share a cell, so for a
+    query user every term except music/weekend is exact per cell and
+    (cell terms + the largest possible music/weekend terms) bounds the score of every member
+    of the cell.
+
+    top_k rescores the best-bounded cells exactly and stops once no remaining cell can beat
+    the current k-th best, so results are exact.
+    """
+    def __init__(self, features, blocks):
+        self.features = features
+        self.blocks = blocks
+        self._grids = {}
+
+    def grid(self, key, mode):
+        """
+        Cells over every candidate of bucket `key` (all compatible buckets), built once per (key, mode).
+        """
+        if (key, mode) not in self._grids:
+            feat = self.features
+            positions = self.blocks.candidates(key, mode)
+            cell_keys = np.column_stack([feat['stats'][positions].astype(np.float64), feat['politics'][positions],
+                                         feat['love_language'][positions], feat['smokes'][positions],
+                                         feat['music'][1][positions], feat['weekend'][1][positions]])
+            cells, inverse = np.unique(cell_keys, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(cells)))])
+            members = positions[np.argsort(inverse, kind='stable')]
+            self._grids[(key, mode)] = (cells, offsets, members)
+        return self._grids[(key, mode)]
+
+    def bounds(self, pos, cells):
+        """
+        Upper bound of calculate_score(pos, member) for the members of each cell.
+        """
+        feat = self.features
+        w = _weights(feat)
+        n_stats = len(STAT_COLS)
+        stats = feat['stats'][pos].astype(np.float64)
+        soft_weight = w['soft_stat_similar'] if feat['seek_sim'][pos] else w['soft_stat_other']
+
+        pol_match = cells[:, n_stats] == feat['politics'][pos]
+        score = np.where(feat['politics_nonneg'][pos] & ~pol_match, w['politics_mismatch_non_negotiable'],
+                         np.where(pol_match, w['politics_match'], 0.0))
+        if feat['smoking_care'][pos]:
+            score += w['smoking_conflict'] * cells[:, n_stats + 2]
+        # Jaccard lies in [0, min(|A|, |B|) / max(|A|, |B|)]
+        for j, key in enumerate(('music', 'weekend')):
+            count_a = int(feat[key][1][pos])
+            count_b = cells[:, n_stats + 3 + j]
+            score += np.maximum(w[key] * np.minimum(count_a, count_b) / np.maximum(np.maximum(count_a, count_b), 1), 0)
+        for k, col in enumerate(STAT_COLS):
+            similarity = 1.0 - np.abs(stats[k] - cells[:, k]) / 4.0
+            score += (w['core_stat'] if col in CORE_STAT_COLS else soft_weight) * similarity
+        score += np.where(cells[:, n_stats + 1] == feat['love_language'][pos], w['love_language'], 0)
+        # Tiny slack so float rounding can never make the bound undershoot the exact score
+        return _normalize(score, w) + 1e-9
+
+    def top_k(self, pos, k, mode="romantic"):
+        """
+        Exact top-k partner positions for `pos` as [(score, position)], best first
+        (ties broken by position, like a full left-to-right scan).
+        """
+        cells, offsets, members = self.grid(self.blocks.key_of(pos), mode)
+        if not len(cells) or k <= 0:
+            return []
+        bounds = self.bounds(pos, cells)
+        pending = np.ones(len(cells), dtype=bool)
+
+        scored_pos, scored_val = [], []
+        kth = -np.inf
+        batch = max(4 * k, 64)
+        while pending.any():
+            open_cells = np.flatnonzero(pending)
+            if bounds[open_cells].max() < kth:
+                break # No remaining cell can reach the current k-th best
+            if len(open_cells) > batch:
+                open_cells = open_cells[np.argpartition(-bounds[open_cells], batch - 1)[:batch]]
+            pending[open_cells] = False
+            batch *= 4
+
+            # Gather the members of the selected cells
+            lengths = offsets[open_cells + 1] - offsets[open_cells]
+            starts = np.repeat(offsets[open_cells] - np.cumsum(lengths) + lengths, lengths)
+            chosen = members[starts + np.arange(lengths.sum())]
+            chosen = chosen[chosen != pos]
+            if len(chosen):
+                scored_pos.append(chosen)
+                scored_val.append(_soft_scores(self.features, np.full(len(chosen), pos), chosen))
+                values = np.concatenate(scored_val)
+                if len(values) >= k:
+                    kth = np.partition(values, len(values) - k)[len(values) - k]
+
+        if not scored_pos:
+            return []
+        positions = np.concatenate(scored_pos)
+        values = np.concatenate(scored_val)
+        best = np.lexsort((positions, -values))[:k]
+        return [(float(values[i]), int(positions[i])) for i in best]
+
+
+class PairStore:
+    """
+    Both directions of every pair, stored once per unordered pair {i < j} in condensed
+    (upper-triangle) order: a flags byte (grade / orientation compatible, politics and love
+    language match), multi-select (overlap, union) counts as uint8 and the absolute stat
+    differences in the stats dtype. That is about 12 bytes per unordered pair, serving both
+    modes and both directions, where the two float64 score matrices take 32.
+
+    The directional part of a score only depends on the asker's flags, which stay in the
+    profile store; scores are recombined on demand in calculate_score's order, so they are
+    bit-for-bit identical to it. None of the stored components depend on the weights, so any
+    weight vector (load_weights) recombines from the same store. Self-pairs are -inf.
+    """
+    GRADE, ORIENTATION, POLITICS, LOVE = 1, 2, 4, 8
+
+    def __init__(self, features, blocks):
+        self.features = features
+        self.blocks = blocks
+        self.n = n = len(features['year'])
+        size = n * (n - 1) // 2
+        # One extra zeroed slot at the end stands in for self-pairs
+        self.flags = np.zeros(size + 1, dtype=np.uint8)
+        self.multi = {key: np.zeros((size + 1, 2), dtype=np.uint8) for key in ('music', 'weekend')}
+        stats_dtype = np.uint8 if features['stats'].dtype == np.uint8 else np.float64
+        self.stat_diff = np.zeros((size + 1, len(STAT_COLS)), dtype=stats_dtype)
+
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            rows = np.arange(start, min(start + SCORE_BLOCK_ROWS, n))
+            cols = np.arange(start, n)
+            upper = rows[:, None] < cols[None, :]
+            grade = _hard_compatible(features, rows, cols, "friend") & upper
+            orientation = ORIENTATION_TABLE[features['profile_code'][rows][:, None], features['profile_code'][cols][None, :]]
+            pair_rows, pair_cols = np.nonzero(grade)
+            a, b = rows[pair_rows], cols[pair_cols]
+            index = self._index(a, b)
+            shared = _pair_components(features, a, b)
+            self.flags[index] = (self.GRADE + self.ORIENTATION * orientation[pair_rows, pair_cols]
+                                 + self.POLITICS * shared['pol_match'] + self.LOVE * shared['love_match'])
+            for key in ('music', 'weekend'):
+                self.multi[key][index] = np.column_stack(shared[key])
+            self.stat_diff[index] = shared['stat_diff']
+
+    def _index(self, a, b):
+        # Condensed position of the unordered pair {a, b}; self-pairs map to the zeroed last slot
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        index = lo * self.n - lo * (lo + 1) // 2 + (hi - lo - 1)
+        return np.where(lo == hi, len(self.flags) - 1, index)
+
+    def nbytes(self):
+        return self.flags.nbytes + sum(m.nbytes for m in self.multi.values()) + self.stat_diff.nbytes
+
+    def _shared(self, index, flags):
+        # The _pair_components dict of the stored pairs at `index`
+        shared = {
+            'pol_match': (flags & self.POLITICS) != 0,
+            'love_match': (flags & self.LOVE) != 0,
+            'stat_diff': self.stat_diff[index],
+        }
+        for key in ('music', 'weekend'):
+            counts = self.multi[key][index]
+            shared[key] = (counts[:, 0], counts[:, 1])
+        return shared
+
+    def _required(self, mode):
+        return self.GRADE | (self.ORIENTATION if mode == "romantic" else 0)
+
+    def pair_scores(self, rows, cols, mode="romantic", backward=True, weights=None):
+        """
+        (forward, backward) blocks as from _pair_block, read from the store
+        (backward is None when not requested). `weights` defaults to the matcher's.
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        a = np.repeat(rows, len(cols))
+        b = np.tile(cols, len(rows))
+        index = self._index(a, b)
+        flags = self.flags[index]
+        required = self._required(mode)
+
+        forward = np.full(len(a), -1000.0)
+        result = [forward, np.full(len(a), -1000.0) if backward else None]
+        forward[a == b] = -np.inf
+        if backward:
+            result[1][a == b] = -np.inf
+        pairs = np.flatnonzero((flags & required) == required)
+        if len(pairs):
+            shared = self._shared(index[pairs], flags[pairs])
+            a, b = a[pairs], b[pairs]
+            forward[pairs] = _directed_scores(self.features, shared, a, b, weights)
+            if backward:
+                result[1][pairs] = _directed_scores(self.features, shared, b, a, weights)
+        shape = (len(rows), len(cols))
+        return tuple(r.reshape(shape) if r is not None else None for r in result)
+
+    def score_block(self, feat, rows, cols, mode="romantic", profiler=NULL_PROFILER):
+        """
+        Drop-in for _score_block (forward direction only), read from the store.
+        """
+        return self.pair_scores(rows, cols, mode, backward=False)[0]
+
+    def best_matches(self, mode="romantic"):
+        return _best_matches(self.features, self.blocks, 0, self.n, mode, scorer=self.score_block)
+
+    def score_matrix(self, mode="romantic", weights=None):
+        """
+        Full directed N x N score matrix recombined under `weights` (a load_weights dict;
+        default: the matcher's), equal to Matcher.score_matrix under those weights except for
+        the -inf diagonal.
+        """
+        scores = np.empty((self.n, self.n), dtype=np.float64)
+        cols = np.arange(self.n)
+        for start in range(0, self.n, SCORE_BLOCK_ROWS):
+            rows = np.arange(start, min(start + SCORE_BLOCK_ROWS, self.n))
+            scores[rows] = self.pair_scores(rows, cols, mode, backward=False, weights=weights)[0]
+        return scores
+
+    def breakdown(self, a, b, mode="romantic", weights=None):
+        """
+        Score of position a towards position b term by term ({SCORE_TERMS entry: contribution},
+        'raw' and 'score'); None if the pair is hard-incompatible or a == b.
+        """
+        index = self._index(np.array([a]), np.array([b]))
+        flags = self.flags[index]
+        if a == b or (flags[0] & self._required(mode)) != self._required(mode):
+            return None
+        w = _weights(self.features) if weights is None else weights
+        return _breakdown(self.features, self._shared(index, flags), a, b, w)
+
+
+def _count_pruned(profiler, blocks, key, n_rows, mode):
+    if profiler.enabled and n_rows:
+        grade, orientation = blocks.rejected(key, mode)
+        profiler.count('pairs_rejected_grade', n_rows * grade)
+        profiler.count('pairs_rejected_orientation', n_rows * orientation)
+
+
+def _best_matches(feat, blocks, start, stop, mode="romantic", profiler=NULL_PROFILER, scorer=_score_block):
+    """
+    Best partner (position, score) for every position in [start, stop); -1 / -inf when none.
+    Only compatible blocking buckets are scored (by `scorer`, which has _score_block's signature).
+    """
+    best_match = np.full(stop - start, -1)
+    best_score = np.full(stop - start, -np.inf)
+    for key, bucket in blocks.buckets.items():
+        rows_all = bucket[(bucket >= start) & (bucket < stop)]
+        cols = blocks.candidates(key, mode)
+        _count_pruned(profiler, blocks, key, len(rows_all), mode)
+        if not len(cols):
+            continue
+        for offset in range(0, len(rows_all), SCORE_BLOCK_ROWS):
+            rows = rows_all[offset:offset + SCORE_BLOCK_ROWS]
+            # Every (row, col) here is hard-compatible by construction of the buckets
+            block = scorer(feat, rows, cols, mode, profiler)
+            block[rows[:, None] == cols[None, :]] = -np.inf # Never match yourself
+
+            best = block.argmax(axis=1) # First best, same tie-break as a left-to-right scan
+            best_match[rows - start] = cols[best]
+            best_score[rows - start] = block[np.arange(len(rows)), best]
+    best_match[best_score == -np.inf] = -1
+    return best_match, best_score
+
+
+def _top_k_rows(feat, blocks, start, stop, k, mode="romantic", profiler=NULL_PROFILER):
+    """
+    Top-k partners for every position in [start, stop) by full (blocked) scan, best first with ties
+    broken by position. Returns (positions, scores) of shape (stop - start, k), padded with -1 / -inf.
+    """
+    top_pos = np.full((stop - start, k), -1)
+    top_val = np.full((stop - start, k), -np.inf)
+    for key, bucket in blocks.buckets.items():
+        rows_all = bucket[(bucket >= start) & (bucket < stop)]
+        cols = blocks.candidates(key, mode)
+        _count_pruned(profiler, blocks, key, len(rows_all), mode)
+        if not len(cols):
+            continue
+        for offset in range(0, len(rows_all), SCORE_BLOCK_ROWS):
+            rows = rows_all[offset:offset + SCORE_BLOCK_ROWS]
+            block = _score_block(feat, rows, cols, mode, profiler)
+            block[(rows[:, None] == cols[None, :]) | (block < -500)] = -np.inf
+            # Columns are sorted by position, so a stable sort on -score keeps the position tie-break
+            order = np.argsort(-block, axis=1, kind='stable')[:, :k]
+            width = order.shape[1]
+            top_pos[rows - start, :width] = cols[order]
+            top_val[rows - start, :width] = np.take_along_axis(block, order, axis=1)
+    top_pos[top_val == -np.inf] = -1
+    return top_pos, top_val
+
+
+def _group_fit_rows(feat, start, stop, members, mode="friend", profiler=NULL_PROFILER):
+    """
+    Running group-fit sum (members added in order, as in find_groups) for every position in [start, stop).
+    Incompatible pairs contribute their -1000.
+    """
+    block = _score_block(feat, np.arange(start, stop), np.asarray(members), mode, profiler)
+    sums = np.zeros(stop - start)
+    for j in range(block.shape[1]):
+        sums += block[:, j]
+    return sums
+
+
+def _pair_features(feat, a, b):
+    """
+    For each directed pair (a[i], b[i]), what each of TERM_WEIGHT_KEYS multiplies in the raw
+    score, as a float32 (terms, pairs) array: raw scores under many weight vectors are then
+    one matrix product.
+    """
+    shared = _pair_components(feat, a, b)
+    core = [STAT_COLS.index(col) for col in CORE_STAT_COLS]
+    soft = [k for k in range(len(STAT_COLS)) if k not in core]
+    soft_sum = len(soft) - shared['stat_diff'][:, soft].sum(axis=1) / 4.0
+    seek_sim = feat['seek_sim'][a]
+
+    features = np.empty((len(TERM_WEIGHT_KEYS), len(a)), dtype=np.float32)
+    features[0] = shared['pol_match']
+    features[1] = feat['politics_nonneg'][a] & ~shared['pol_match']
+    features[2] = feat['smoking_care'][a] & feat['smokes'][b]
+    for j, key in enumerate(('music', 'weekend'), 3):
+        overlap, union = shared[key]
+        features[j] = overlap / union
+    features[5] = len(core) - shared['stat_diff'][:, core].sum(axis=1) / 4.0
+    features[6] = soft_sum * seek_sim
+    features[7] = soft_sum * ~seek_sim
+    features[8] = shared['love_match']
+    return features
+
+
+def _sweep_rows(feat, blocks, start, stop, configs, mode="romantic", profiler=NULL_PROFILER):
+    """
+    Best partner positions and scores, shape (stop - start, configs), for every position in
+    [start, stop) under each column of `configs` (weight vectors in WEIGHT_KEYS order);
+    -1 / -inf when none. Raw scores of every config come from one float32 matrix product per
+    block; a best partner clear of the runner-up and of the clamped ends by more than float32
+    rounding can reach is final, anything closer is rescored exactly, so results equal
+    _best_matches under each config.
+    """
+    n_configs = configs.shape[1]
+    n_terms = len(TERM_WEIGHT_KEYS)
+    term_weights = configs[:n_terms].T.astype(np.float32)
+    raw_min = configs[WEIGHT_KEYS.index('raw_min')]
+    raw_max = configs[WEIGHT_KEYS.index('raw_max')]
+    eps = 1e-5 * np.abs(configs[:n_terms]).sum(axis=0) + 1e-9
+
+    rescore_config, rescore_a, rescore_b = [], [], []
+    buffer = np.empty(0, dtype=np.float32) # Reused across blocks
+    for key, bucket in blocks.buckets.items():
+        rows_all = bucket[(bucket >= start) & (bucket < stop)]
+        cols = blocks.candidates(key, mode)
+        _count_pruned(profiler, blocks, key, len(rows_all), mode)
+        if not len(cols):
+            continue
+        step = max(1, SWEEP_BLOCK_ELEMENTS // (len(cols) * n_configs))
+        for offset in range(0, len(rows_all), step):
+            rows = rows_all[offset:offset + step]
+            a, b = np.repeat(rows, len(cols)), np.tile(cols, len(rows))
+            profiler.count('pairs_evaluated', len(a))
+            if buffer.size < n_configs * len(a):
+                buffer = np.empty(max(SWEEP_BLOCK_ELEMENTS, n_configs * len(a)), dtype=np.float32)
+            raw = buffer[:n_configs * len(a)].reshape(n_configs, len(a))
+            np.matmul(term_weights, _pair_features(feat, a, b), out=raw)
+            raw = raw.reshape(n_configs, len(rows), len(cols))
+            raw[:, rows[:, None] == cols[None, :]] = -np.inf # Never match yourself
+
+            # Best and runner-up of every (config, row)
+            best = raw.argmax(axis=2)
+            config_idx, row_idx = np.ogrid[:n_configs, :len(rows)]
+            top = raw[config_idx, row_idx, best]
+            raw[config_idx, row_idx, best] = -np.inf
+            second = raw.max(axis=2)
+            raw[config_idx, row_idx, best] = top
+
+            margin = eps[:, None]
+            found = np.isfinite(top)
+            clear = found & (second < top - margin) & (top < raw_max[:, None] - margin) & (top > raw_min[:, None] + margin)
+            c, r = np.nonzero(clear)
+            rescore_config.append(c)
+            rescore_a.append(rows[r])
+            rescore_b.append(cols[best[c, r]])
+
+            # Near-ties (or ties through clamping): every partner that could share the best
+            # normalized score. Below raw_min - eps everything clamps to score_min, where the
+            # first partner wins; partners after the first one surely clamped to score_max cannot
+            # win, so columns are scanned in chunks and each row stops there.
+            c, r = np.nonzero(found & ~clear)
+            low = top[c, r] <= raw_min[c] + eps[c]
+            threshold = np.where(low, raw_min[c], np.minimum(top[c, r], raw_max[c])) - eps[c]
+            sure_max = raw_max[c] + eps[c]
+            near_c, near_r, near_j = [c[low]], [r[low]], [(raw[c[low], r[low]] > -np.inf).argmax(axis=1)]
+            pending = np.arange(len(c))
+            for lo in range(0, len(cols), NEAR_TIE_CHUNK):
+                values = raw[c[pending], r[pending], lo:lo + NEAR_TIE_CHUNK]
+                clamped = values >= sure_max[pending][:, None]
+                hit = clamped.any(axis=1)
+                last = np.where(hit, clamped.argmax(axis=1), values.shape[1])
+                k, j = np.nonzero((values >= threshold[pending][:, None]) & (np.arange(values.shape[1]) <= last[:, None]))
+                near_c.append(c[pending[k]])
+                near_r.append(r[pending[k]])
+                near_j.append(lo + j)
+                pending = pending[~hit]
+                if not len(pending):
+                    break
+            near_r = np.concatenate(near_r)
+            rescore_config += near_c
+            rescore_a.append(rows[near_r])
+            rescore_b.append(cols[np.concatenate(near_j)])
+            profiler.count('sweep_rescored', len(near_r))
+
+    best_match = np.full((stop - start, n_configs), -1)
+    best_score = np.full((stop - start, n_configs), -np.inf)
+    if not rescore_config:
+        return best_match, best_score
+    config = np.concatenate(rescore_config)
+    a, b = np.concatenate(rescore_a), np.concatenate(rescore_b)
+    exact = np.empty(len(a))
+    by_config = np.argsort(config, kind='stable')
+    bounds = np.searchsorted(config[by_config], np.arange(n_configs + 1))
+    for c in range(n_configs):
+        sel = by_config[bounds[c]:bounds[c + 1]]
+        weights = dict(zip(WEIGHT_KEYS, configs[:, c].tolist()))
+        exact[sel] = _directed_scores(feat, _pair_components(feat, a[sel], b[sel]), a[sel], b[sel], weights)
+
+    # Highest exact score per (config, row), ties to the lowest position as in _best_matches
+    order = np.lexsort((b, -exact, a, config))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (config[order][1:] != config[order][:-1]) | (a[order][1:] != a[order][:-1])
+    chosen = order[first]
+    best_match[a[chosen] - start, config[chosen]] = b[chosen]
+    best_score[a[chosen] - start, config[chosen]] = exact[chosen]
+    return best_match, best_score
+
+
+def _exact_matching(src, dst, weight, n):
+    """
+    Maximum-cardinality matching of greatest total weight (Edmonds' blossom algorithm, cubic
+    in the number of users). Returns mate positions (-1 when unmatched).
+    """
+    import networkx as nx
+
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+    mate = np.full(n, -1)
+    for a, b in nx.max_weight_matching(graph, maxcardinality=True):
+        mate[a], mate[b] = b, a
+    return mate
+
+
+def _greedy_matching(src, dst, weight, n):
+    """
+    One-to-one matching over the undirected edges (src[i], dst[i], weight[i]): edges are taken
+    heaviest first (ties by position) while both ends are free, then every user left over
+    looks for a short augmenting path u - v = w - ... - x (partners shift along the path to
+    free user x), so the matching only grows. Returns mate positions (-1 when unmatched).
+    Near-linear in the number of edges, unlike the cubic blossom algorithm.
+    """
+    mate = [-1] * n
+    order = np.lexsort((dst, src, -weight))
+    for a, b in zip(src[order].tolist(), dst[order].tolist()):
+        if mate[a] < 0 and mate[b] < 0:
+            mate[a], mate[b] = b, a
+
+    # Neighbours heaviest first, so augmenting paths prefer good partners
+    neighbours = {}
+    for a, b in zip(src[order].tolist(), dst[order].tolist()):
+        neighbours.setdefault(a, []).append(b)
+        neighbours.setdefault(b, []).append(a)
+
+    def augment(u, visited, depth):
+        for v in neighbours[u]:
+            if v in visited:
+                continue
+            visited.add(v)
+            w = mate[v]
+            if w >= 0:
+                if depth >= AUGMENT_DEPTH or w in visited:
+                    continue
+                visited.add(w)
+                if not augment(w, visited, depth + 1): # Find v's partner someone else
+                    continue
+            mate[u], mate[v] = v, u
+            return True
+        return False
+
+    # Each pass shares one visited set, so a pass is linear in the number of edges; passes
+    # repeat while they still find paths
+    free = [u for u in sorted(neighbours) if mate[u] < 0]
+    while free:
+        visited = set()
+        found = [u for u in free if u not in visited and (visited.add(u) or augment(u, visited, 0))]
+        if not found:
+            break
+        free = [u for u in free if mate[u] < 0]
+    return np.array(mate)
+
+
+# --- Process-pool sharding ---
+# Worker processes attach to the encoded profile arrays in shared memory instead of
+# receiving a pickled DataFrame.
+_WORKER = {}
+
+
+def _flatten_features(feat):
+    flat = {}
+    for key, value in feat.items():
+        if isinstance(value, tuple):
+            for i, part in enumerate(value):
+                flat[f"{key}.{i}"] = part
+        else:
+            flat[key] = value
+    return flat
+
+
+def _unflatten_features(flat):
+    feat = {}
+    for name, value in flat.items():
+        key, _, part = name.partition('.')
+        if part:
+            feat.setdefault(key, []).append((int(part), value))
+        else:
+            feat[key] = value
+    return {key: tuple(v for _, v in sorted(value)) if isinstance(value, list) else value for key, value in feat.items()}
+
+
+def _attach_worker(descriptors):
+    handles, flat = [], {}
+    for name, (shm_name, shape, dtype) in descriptors.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        handles.append(shm)
+        flat[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _WORKER['handles'] = handles # Keep the mappings alive for the worker's lifetime
+    _WORKER['features'] = _unflatten_features(flat)
+    _WORKER['blocks'] = BlockingIndex(_WORKER['features'])
+
+
+def _worker_task(task):
+    kind, start, stop, args, profile = task
+    feat, blocks = _WORKER['features'], _WORKER['blocks']
+    profiler = Profiler() if profile else NULL_PROFILER
+    if kind == 'best':
+        result = _best_matches(feat, blocks, start, stop, *args, profiler=profiler)
+    elif kind == 'top_k':
+        result = _top_k_rows(feat, blocks, start, stop, *args, profiler=profiler)
+    elif kind == 'sweep':
+        result = _sweep_rows(feat, blocks, start, stop, *args, profiler=profiler)
+    else:
+        result = _group_fit_rows(feat, start, stop, *args, profiler=profiler)
+    return result, (profiler.counters if profile else None)
+
+
+class ShardedScorer:
+    """
+    Splits the pair space into row blocks scored by a process pool. The encoded profile arrays
+    are placed in multiprocessing.shared_memory once; each worker maps them and rebuilds the
+    (cheap) blocking index. Per-block results are merged in row order, so they are identical
+    to the single-process path.
+
+        with ShardedScorer(matcher.features, workers=8) as pool:
+            best_match, best_score = pool.best_matches()
+    """
+    def __init__(self, features, workers, profiler=NULL_PROFILER):
+        self.features = features
+        self.workers = workers
+        self.profiler = profiler
+        self.n = len(features['year'])
+        self._shm = []
+        self._pool = None
+
+    def __enter__(self):
+        descriptors = {}
+        for name, array in _flatten_features(self.features).items():
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            self._shm.append(shm)
+            descriptors[name] = (shm.name, array.shape, array.dtype.str)
+        self._pool = multiprocessing.get_context().Pool(self.workers, initializer=_attach_worker, initargs=(descriptors,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+
+    def _map(self, kind, args):
+        # A few shards per worker so uneven buckets still balance
+        shard = max(SCORE_BLOCK_ROWS, -(-self.n // (self.workers * 4)))
+        tasks = [(kind, start, min(start + shard, self.n), args, self.profiler.enabled) for start in range(0, self.n, shard)]
+        results = []
+        for result, counters in self._pool.map(_worker_task, tasks):
+            if counters:
+                self.profiler.merge(counters)
+            results.append(result)
+        return results
+
+    def best_matches(self, mode="romantic"):
+        parts = self._map('best', (mode,))
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def top_k(self, k, mode="romantic"):
+        parts = self._map('top_k', (k, mode))
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def group_fit_sums(self, members, mode="friend"):
+        return np.concatenate(self._map('group', (list(members), mode)))
+
+    def sweep(self, configs, mode="romantic"):
+        parts = self._map('sweep', (configs, mode))
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
 
 class Matcher:
-    def __init__(self, df):
+    def __init__(self, df, workers=1, cache_dir=None, cache_dtype=np.float64, profiler=None, weights=None):
         self.df = df
+        self.weights = load_weights(weights)
+        self.workers = workers
+        self.profiler = profiler or NULL_PROFILER
+        self.cache_dir = cache_dir
+        self.cache_dtype = np.dtype(cache_dtype)
         self.ids = df.index.tolist()
-        
+        self.positions = {uid: i for i, uid in enumerate(self.ids)}
+        self._codebooks = {'politics': {}, 'love_language': {}, 'music': {}, 'weekend': {}}
+        self.features = self.encode_profiles()
+        self.features['weights'] = self._weight_vector()
+        self.blocks = BlockingIndex(self.features)
+        self._stat_index = None
+        self._pair_store = None
+        self._score_matrices = {}
+        self._ideal = None # (best_match positions, best_scores) once find_ideal_matches has run
+
+    @_profiled("encode")
+    def encode_profiles(self, df=None):
+        """
+        Encodes every feature calculate_score reads into a compact profile store (one pass over
+        the DataFrame): small-int codes for categorical answers, bitsets over an interned
+        vocabulary for multi-select answers, uint8 stats and flags as bools. Codes and bitset
+        vocabularies persist on the matcher, so encoding a later batch (`df`) yields codes
+        consistent with the existing population.
+        """
+        df = self.df if df is None else df
+        books = self._codebooks
+
+        def codes(name, values):
+            return np.array([books[name].setdefault(v, len(books[name])) for v in values], dtype=CODE_DTYPE)
+
+        def as_str(col):
+            return [str(v) for v in df[col].tolist()]
+
+        # Gender / orientation categories as small integer codes (each distinct answer is categorized once)
+        gender_codes = {g: GENDER_CATEGORIES.index(self.get_gender_category({'gender': g})) for g in set(as_str('gender'))}
+        orientation_codes = {o: ORIENTATION_CATEGORIES.index(self.get_orientation_category({'orientation': o})) for o in set(as_str('orientation'))}
+        profile_codes = [gender_codes[g] * len(ORIENTATION_CATEGORIES) + orientation_codes[o]
+                         for g, o in zip(as_str('gender'), as_str('orientation'))]
+
+        politics = as_str('politics')
+        love = [v.lower() for v in as_str('love_language')]
+        smoking = [v.lower() for v in as_str('smoking')]
+
+        # Form stats are 1-5 integers; anything else keeps its exact float values
+        stats = df[STAT_COLS].to_numpy(dtype=np.float64)
+        if np.all((stats >= 0) & (stats <= 255) & (stats == np.round(stats))):
+            stats = stats.astype(np.uint8)
+
+        return {
+            'year': pd.to_numeric(df['year'], errors='coerce').to_numpy(dtype=np.float32),
+            'profile_code': np.array(profile_codes, dtype=np.int8),
+            'seek_sim': np.array(["similar" in v.lower() for v in as_str('similar_preference')], dtype=bool),
+            'politics': codes('politics', politics),
+            'politics_nonneg': np.array(["non-negotiable" in v for v in as_str('politics_preference')], dtype=bool),
+            'smokes': np.array(["yes" in v.split(',')[0] for v in smoking], dtype=bool),
+            'smoking_care': np.array(["i do care" in v for v in smoking], dtype=bool),
+            'music': _multi_hot(df['music'].tolist(), books['music']),
+            'weekend': _multi_hot(df['weekend'].tolist(), books['weekend']),
+            'stats': stats,
+            'love_language': codes('love_language', love),
+        }
+
     def get_grade_compatibility(self, year_a, year_b):
         """
         Returns True if years are adjacent or same.
@@ -110,90 +1543,24 @@ class Matcher:
         Non-binary Logic (User approved plan for permissiveness):
         NB + NB
         NB + Bi/Pan/Queer (Man/Woman)
+
+        The allow-list is compiled once into ORIENTATION_TABLE (see ALLOWED_ORIENTATION_PAIRS).
+        Users may be given as ids of loaded profiles (codes precomputed at load time)
+        or as ad-hoc rows with 'gender' / 'orientation' fields.
         """
-        
-        g_a = self.get_gender_category(user_a)
-        o_a = self.get_orientation_category(user_a)
-        g_b = self.get_gender_category(user_b)
-        o_b = self.get_orientation_category(user_b)
-        
-        # Define Tuple: (Gender, Orientation)
-        p_a = (g_a, o_a)
-        p_b = (g_b, o_b)
-        
-        # Allowed set (Direction agnostic, we will check both A->B and B->A logic or just set membership of the frozen set of pairs)
-        # Actually simplest is to just check if the sorted pair of tuples is in the allowlist.
-        
-        # Let's normalize the pair key: sorted by some property? 
-        # Or just check both permutations against a set of allowed directed pairs (but this is symmetric matching).
-        # We'll use a set of frozensets to represent allowed unordered pairs.
-        
-        allowed_pairs = set()
-        
-        def add_pair(g1, o1, g2, o2):
-            allowed_pairs.add(frozenset({(g1, o1), (g2, o2)}))
-            
-        # User List
-        # 1. straight man + straight women
-        add_pair('Man', 'Straight', 'Woman', 'Straight')
-        
-        # 2. bi men + straight women
-        add_pair('Man', 'Bi', 'Woman', 'Straight')
-        
-        # 3. bi men + bi men
-        add_pair('Man', 'Bi', 'Man', 'Bi')
-        
-        # 4. bi men + bi women
-        add_pair('Man', 'Bi', 'Woman', 'Bi')
-        
-        # 5. gay men + bi men
-        add_pair('Man', 'Gay', 'Man', 'Bi')
-        
-        # 6. gay men + gay men
-        add_pair('Man', 'Gay', 'Man', 'Gay')
-        
-        # 7. bi women + straight men (Covered by #2 reversed, but adding explicitly does no harm to set logic)
-        add_pair('Woman', 'Bi', 'Man', 'Straight')
-        
-        # 8. bi women + bi women
-        add_pair('Woman', 'Bi', 'Woman', 'Bi')
-        
-        # 9. gay women + bi women
-        add_pair('Woman', 'Gay', 'Woman', 'Bi')
-        
-        # 10. gay women + gay women
-        add_pair('Woman', 'Gay', 'Woman', 'Gay')
-        
-        # NB Logic
-        # NB + NB
-        add_pair('NB', 'Bi', 'NB', 'Bi')      # NB is treated as 'Bi' orientation-wise if unspecified? 
-        # Actually my helper returns 'Bi' for fallback. If NB says 'Gay', they get 'Gay'. 
-        # But 'Gay' usually implies 'Same Gender'. NB+NB is Same Gender?
-        # Let's just Allow Any NB + Any NB?
-        # Or specifically NB + NB (regardless of orientation)?
-        # For simplicity in this function, let's assume if Gender is NB, we allow match with NB.
-        # But we also want NB + Bi (Man/Woman).
-        
-        pair_to_check = frozenset({p_a, p_b})
-        
-        if pair_to_check in allowed_pairs:
-            return True
-            
-        # Special NB Handling Checks (since they might strictly fail the set above if we don't enumerate all)
-        
-        # NB + NB matching
-        if g_a == 'NB' and g_b == 'NB':
-            return True
-            
-        # NB + Bi/Pan (Man or Woman)
-        # If one is NB, the other MUST be Bi (which includes Pan/Queer/Fluid)
-        if (g_a == 'NB' and o_b == 'Bi') or (g_b == 'NB' and o_a == 'Bi'):
-            return True
-        return False
-        
+        return bool(ORIENTATION_TABLE[self.get_profile_code(user_a), self.get_profile_code(user_b)])
+
+    def get_profile_code(self, user):
+        if isinstance(user, (pd.Series, dict)):
+            return profile_code(self.get_gender_category(user), self.get_orientation_category(user))
+        return self.features['profile_code'][self.positions[user]]
+
     def calculate_score(self, idx_a, idx_b, mode="romantic"):
-        user_a = self.df.loc[idx_a]
-        user_b = self.df.loc[idx_b]
+        # Reads the encoded profile store (see encode_profiles), not the DataFrame rows
+        feat = self.features
+        w = self.weights
+        a = self.positions[idx_a]
+        b = self.positions[idx_b]
         
         score = 0
         max_score = 0
@@ -201,12 +1568,12 @@ class Matcher:
         # --- Hard Constraints ---
         
         # 1. Grade Adjacency
-        if not self.get_grade_compatibility(user_a['year'], user_b['year']):
+        if not self.get_grade_compatibility(feat['year'][a], feat['year'][b]):
             return -1000
             
         # 2. Orientation (Only for Romantic)
         if mode == "romantic":
-            if not self.get_orientation_compatibility(user_a, user_b):
+            if not ORIENTATION_TABLE[feat['profile_code'][a], feat['profile_code'][b]]:
                 return -1000
 
         # --- Soft Constraints / Scoring ---
@@ -214,17 +1581,18 @@ class Matcher:
         # 1. Look for Similarity vs Difference
         # "Are you looking for someone who is similar to you or is different?"
         # We'll take the asker's preference (user_a)
-        seek_sim = "similar" in str(user_a['similar_preference']).lower()
+        seek_sim = bool(feat['seek_sim'][a])
         
         # Helper for scoring
-        def compare_categorical(val_a, val_b, weight=1.0):
-            return weight if str(val_a).lower() == str(val_b).lower() else 0
+        def compare_categorical(key, weight=1.0):
+            # Codes are interned from the lowercased answers
+            return weight if feat[key][a] == feat[key][b] else 0
             
-        def compare_multi_select(val_a, val_b, weight=1.0):
-            set_a = set(str(val_a).split(', '))
-            set_b = set(str(val_b).split(', '))
-            overlap = len(set_a.intersection(set_b))
-            union = len(set_a.union(set_b))
+        def compare_multi_select(key, weight=1.0):
+            # Jaccard on the option bitsets
+            bits, count = feat[key]
+            overlap = sum(int(word).bit_count() for word in bits[a] & bits[b])
+            union = int(count[a]) + int(count[b]) - overlap
             if union == 0: return 0
             return weight * (overlap / union)
             
@@ -244,72 +1612,221 @@ class Matcher:
         
         # Politics (High weight)
         # If user has non-negotiables, penalize heavily for difference
-        pol_pref_a = str(user_a['politics_preference'])
-        pol_match = (str(user_a['politics']) == str(user_b['politics']))
+        pol_match = (feat['politics'][a] == feat['politics'][b])
         
-        if "non-negotiable" in pol_pref_a and not pol_match:
-            score -= 50
+        if feat['politics_nonneg'][a] and not pol_match:
+            score += w['politics_mismatch_non_negotiable']
         elif pol_match:
-            score += 10
-        max_score += 10
+            score += w['politics_match']
+        max_score += w['politics_match']
             
         # Smoking
         # "No I don't smoke, I do care about if my partner smokes."
-        smokes_b = "yes" in str(user_b['smoking']).lower().split(',')[0] # simplistic check
-        care_a = "i do care" in str(user_a['smoking']).lower()
+        smokes_b = feat['smokes'][b] # "yes" before the first comma
+        care_a = feat['smoking_care'][a] # "i do care"
         
         if care_a and smokes_b:
-            score -= 50
+            score += w['smoking_conflict']
         
         # Interests (Music, Weekend)
-        score += compare_multi_select(user_a['music'], user_b['music'], weight=15)
-        score += compare_multi_select(user_a['weekend'], user_b['weekend'], weight=15)
-        max_score += 30
+        score += compare_multi_select('music', weight=w['music'])
+        score += compare_multi_select('weekend', weight=w['weekend'])
+        max_score += w['music'] + w['weekend']
         
         # Vibe / Personality (Stats)
-        stat_cols = ['stat_trust', 'stat_humor', 'stat_communication', 'stat_kindness', 'stat_looks', 'stat_money', 'stat_ambition']
+        stats_a = feat['stats'][a].tolist()
+        stats_b = feat['stats'][b].tolist()
         
-        for col in stat_cols:
+        for k, col in enumerate(STAT_COLS):
             # If finding similar: high weight on small diff
             # If finding different: slightly lower weight on small diff (or reward diff)
             # Generally, people want similar values on core things like Trust/Kindness even if they want "different" personalities.
             # We'll keep Trust/Comm/Kindness as "Must be high/similar".
             if col in ['stat_trust', 'stat_communication', 'stat_kindness']:
-                score += compare_numeric_diff(user_a[col], user_b[col], weight=5)
+                score += compare_numeric_diff(stats_a[k], stats_b[k], weight=w['core_stat'])
             else:
                 # For looks, ambition, etc, respect the "similar/different" pref slightly
                 if seek_sim:
-                    score += compare_numeric_diff(user_a[col], user_b[col], weight=3)
+                    score += compare_numeric_diff(stats_a[k], stats_b[k], weight=w['soft_stat_similar'])
                 else:
                     # If they want different, maybe we don't penalize difference as much, 
                     # or we actually reward it? Let's just make it neutral weight or lower weight for similarity.
-                    score += compare_numeric_diff(user_a[col], user_b[col], weight=1) 
-            max_score += 5 # (approx max contribution)
+                    score += compare_numeric_diff(stats_a[k], stats_b[k], weight=w['soft_stat_other'])
+            max_score += w['core_stat'] # (approx max contribution)
 
         # Love Language (Good to match)
-        score += compare_categorical(user_a['love_language'], user_b['love_language'], weight=10)
-        max_score += 10
+        score += compare_categorical('love_language', weight=w['love_language'])
+        max_score += w['love_language']
 
         # --- Score Normalization ---
-        # Target Range: 38.8 to 98.6
-        # Expected Raw Range: approx -60 to 90
-        if score < -500:
+        # Target Range: score_min to score_max (default 38.8 to 98.6)
+        # Expected Raw Range: approx raw_min to raw_max (default -60 to 90)
+        if score < HARD_INCOMPATIBLE_RAW:
             return score # Hard Incompatible
             
         # Linear Mapping
         # norm = min_target + (score - min_raw) * (range_target / range_raw)
-        # min_raw = -60, max_raw = 90 -> range = 150
-        # min_target = 38.8, max_target = 98.6 -> range = 59.8
+        # default: min_raw = -60, max_raw = 90 -> range = 150
+        #          min_target = 38.8, max_target = 98.6 -> range = 59.8
         
-        factor = 59.8 / 150.0
-        normalized = 38.8 + (score + 60) * factor
+        factor = (w['score_max'] - w['score_min']) / (w['raw_max'] - w['raw_min'])
+        normalized = w['score_min'] + (score - w['raw_min']) * factor
         
         # Clamp
-        normalized = max(38.8, min(normalized, 98.6))
+        normalized = max(w['score_min'], min(normalized, w['score_max']))
 
         return normalized
 
 
+    def blocking_stats(self, mode="romantic"):
+        """
+        Number of directed pairs pruned by the blocking index before any scoring.
+        """
+        return self.blocks.stats(mode)
+
+    def hard_compatible_mask(self, mode="romantic", rows=None, cols=None):
+        """
+        Boolean array: True where the pair passes grade adjacency AND (romantic only) orientation.
+        Full N x N by default; `rows` / `cols` (positions) select a block.
+        """
+        n = len(self.ids)
+        rows = np.arange(n) if rows is None else rows
+        cols = np.arange(n) if cols is None else cols
+        return _hard_compatible(self.features, rows, cols, mode)
+
+    @_profiled("score_matrix")
+    def score_matrix(self, mode="romantic"):
+        """
+        Full directed N x N array where entry [i, j] == calculate_score(ids[i], ids[j], mode).
+        Computed once per mode with NumPy broadcasting and cached on the matcher.
+
+        Memory: 8 * N^2 bytes per mode (about 800 MB per mode at 10k profiles).
+        Call clear_score_cache() once the matrices are no longer needed.
+        """
+        if mode in self._score_matrices:
+            self.profiler.count('score_matrix_cache_hits')
+        else:
+            self.profiler.count('score_matrix_cache_misses')
+            if self.cache_dir:
+                self._score_matrices[mode] = self._cached_score_matrix(mode)
+            else:
+                scores = np.empty((len(self.ids), len(self.ids)), dtype=np.float64)
+                self._fill_scores(scores, mode)
+                self._score_matrices[mode] = scores
+        return self._score_matrices[mode]
+
+    def _fill_scores(self, scores, mode):
+        n = len(self.ids)
+        cols = np.arange(n)
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            rows = np.arange(start, min(start + SCORE_BLOCK_ROWS, n))
+            scores[rows] = _score_block(self.features, rows, cols, mode, self.profiler)
+
+    def score_cache_key(self, mode="romantic"):
+        """
+        Content hash of the cleaned scored columns (and ids), the scoring version and weights,
+        mode and dtype.
+        """
+        digest = hashlib.sha256(f"v{SCORING_VERSION}:{mode}:{self.cache_dtype.str}".encode())
+        digest.update(json.dumps(self.weights, sort_keys=True).encode())
+        digest.update(pd.util.hash_pandas_object(self.df[SCORED_COLS], index=True).to_numpy().tobytes())
+        return digest.hexdigest()[:20]
+
+    def _cached_score_matrix(self, mode):
+        """
+        Opens (or builds once) the score matrix as a read-only np.memmap under cache_dir, so
+        reruns on unchanged data page in only the rows they touch.
+        The default float64 cache is bit-exact; cache_dtype=np.float32 halves the file size
+        at the cost of ~1e-5 rounding (enough to flip exact ties).
+        """
+        path = os.path.join(self.cache_dir, f"scores_{mode}_{self.score_cache_key(mode)}.npy")
+        if os.path.exists(path):
+            self.profiler.count('disk_cache_hits')
+        else:
+            self.profiler.count('disk_cache_misses')
+            os.makedirs(self.cache_dir, exist_ok=True)
+            n = len(self.ids)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            scores = np.lib.format.open_memmap(tmp, mode='w+', dtype=self.cache_dtype, shape=(n, n))
+            self._fill_scores(scores, mode)
+            scores.flush()
+            del scores
+            os.replace(tmp, path) # Readers never see a half-written file
+        return np.load(path, mmap_mode='r')
+
+    def clear_score_cache(self, mode=None):
+        """
+        Drops the cached score matrix for `mode` (or every mode, and the pair store) to release its memory.
+        """
+        if mode is None:
+            self._score_matrices.clear()
+            self._pair_store = None
+        else:
+            self._score_matrices.pop(mode, None)
+
+    def _weight_vector(self):
+        return np.array([self.weights[k] for k in WEIGHT_KEYS], dtype=np.float64)
+
+    def set_weights(self, weights):
+        """
+        Switches to new scoring weights (a dict or JSON path, see load_weights). Cached score
+        matrices and best matches are dropped; a built PairStore or top-k index is kept, since
+        neither depends on the weights.
+        """
+        self.weights = load_weights(weights)
+        self.features['weights'] = self._weight_vector()
+        self._score_matrices.clear()
+        self._ideal = None
+
+    def score_breakdown(self, idx_a, idx_b, mode="romantic"):
+        """
+        Why idx_a scores idx_b as it does: {SCORE_TERMS entry: raw contribution} plus the 'raw'
+        total and the normalized 'score' (== calculate_score). None if hard-incompatible.
+        Read from the PairStore when built.
+        """
+        a, b = self.positions[idx_a], self.positions[idx_b]
+        if self._pair_store is not None:
+            return self._pair_store.breakdown(a, b, mode, self.weights)
+        rows, cols = np.array([a]), np.array([b])
+        if not _hard_compatible(self.features, rows, cols, mode)[0, 0]:
+            return None
+        return _breakdown(self.features, _pair_components(self.features, rows, cols), a, b, self.weights)
+
+    @_profiled("pair_store")
+    def build_pair_store(self):
+        """
+        Builds the PairStore: both directions of every pair from one pass over the unordered
+        pairs (about 6 bytes per directed pair for both modes). Once built, find_ideal_matches
+        and find_mutual_matches read their scores from it.
+        """
+        if self._pair_store is None:
+            self._pair_store = PairStore(self.features, self.blocks)
+        return self._pair_store
+
+    def build_top_k_index(self, modes=("romantic", "friend")):
+        """
+        Builds the StatIndex behind top_k (and every bucket's grid for `modes`) up front, so
+        long-running callers never pay for it on the first query.
+        """
+        if self._stat_index is None:
+            self.profiler.count('stat_index_builds')
+            self._stat_index = StatIndex(self.features, self.blocks)
+        for mode in modes:
+            for key in self.blocks.buckets:
+                self._stat_index.grid(key, mode)
+        return self._stat_index
+
+    @_profiled("top_k")
+    def top_k(self, idx, k=5, mode="romantic"):
+        """
+        The k best partners for user `idx` as [(other_id, score)], best first.
+        Backed by a StatIndex (built on first use): only compatible buckets are searched and
+        only cells whose score bound can still make the top k are rescored exactly.
+        """
+        if self._stat_index is None:
+            self.build_top_k_index(modes=())
+        return [(self.ids[p], s) for s, p in self._stat_index.top_k(self.positions[idx], k, mode)]
+
     def find_all_matches(self):
         """
         Legacy method: Runs both checks.
@@ -318,169 +1835,663 @@ class Matcher:
         groups = self.find_groups()
         return matches, groups
 
+    @_profiled("ideal_matches")
     def find_ideal_matches(self):
         """
         Generates Ideal Match (Pair) for everyone.
+        Only pairs from compatible blocking buckets are scored (sharded over `workers` processes if > 1).
         """
         # --- 1. Ideal Matches ---
         print("\nCalculating Ideal Matches...")
+        if "romantic" in self._score_matrices:
+            self.profiler.count('score_matrix_cache_hits')
+            best_match, best_score = self._best_from_matrix(self._score_matrices["romantic"])
+        elif self._pair_store is not None:
+            best_match, best_score = self._pair_store.best_matches("romantic")
+        elif self.workers > 1:
+            with ShardedScorer(self.features, self.workers, self.profiler) as pool:
+                best_match, best_score = pool.best_matches("romantic")
+        else:
+            best_match, best_score = _best_matches(self.features, self.blocks, 0, len(self.ids), "romantic", self.profiler)
+
+        self._ideal = (best_match, best_score)
+        return self._matches_dict(range(len(self.ids)))
+
+    def _best_from_matrix(self, scores):
+        # Same result as _best_matches, read from an already computed (possibly memory-mapped) matrix
+        n = len(self.ids)
+        best_match = np.full(n, -1)
+        best_score = np.full(n, -np.inf)
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            rows = np.arange(start, min(start + SCORE_BLOCK_ROWS, n))
+            block = np.array(scores[rows], dtype=np.float64)
+            block[(block < -500) | (rows[:, None] == np.arange(n)[None, :])] = -np.inf
+            best = block.argmax(axis=1)
+            best_match[rows] = best
+            best_score[rows] = block[np.arange(len(rows)), best]
+        best_match[best_score == -np.inf] = -1
+        return best_match, best_score
+
+    def _matches_dict(self, positions):
+        best_match, best_score = self._ideal
         matches = {}
-        for idx in self.ids:
-            best_score = -float('inf')
-            best_match = None
-            
-            for other_idx in self.ids:
-                if idx == other_idx: continue
-                
-                s = self.calculate_score(idx, other_idx, mode="romantic")
-                if s > best_score and s > -500: # Filter out hard incompatible
-                    best_score = s
-                    best_match = other_idx
-            
-            matches[idx] = (best_match, best_score)
+        for i in positions:
+            if best_match[i] < 0:
+                matches[self.ids[i]] = (None, -float('inf'))
+            else:
+                matches[self.ids[i]] = (self.ids[best_match[i]], float(best_score[i]))
         return matches
 
+    @_profiled("sweep")
+    def sweep_weights(self, configs, mode="romantic"):
+        """
+        Evaluates many weight configurations (see load_sweep) in one batched pass over the
+        blocked pairs, sharded over `workers` processes if > 1. Each config's best matches are
+        exactly find_ideal_matches' under it.
+
+        Returns one summary per config: its weights, matched / unmatched users, coverage, the
+        distribution of best-match scores and how many users' best match changed versus the
+        current weights.
+        """
+        configs = load_sweep(configs)
+        table = np.array([[w[k] for k in WEIGHT_KEYS] for w in [self.weights] + configs], dtype=np.float64).T
+        n = len(self.ids)
+        if self.workers > 1:
+            with ShardedScorer(self.features, self.workers, self.profiler) as pool:
+                best_match, best_score = pool.sweep(table, mode)
+        else:
+            best_match, best_score = _sweep_rows(self.features, self.blocks, 0, n, table, mode, self.profiler)
+
+        summaries = []
+        for c, weights in enumerate(configs, 1):
+            matched = best_match[:, c] >= 0
+            scores = best_score[matched, c]
+            percentiles = np.percentile(scores, [0, 10, 50, 90, 100]) if len(scores) else [np.nan] * 5
+            summaries.append({
+                'weights': weights,
+                'matched': int(matched.sum()),
+                'unmatched': int(n - matched.sum()),
+                'coverage': float(matched.mean()) if n else 0.0,
+                'best_min': float(percentiles[0]),
+                'best_p10': float(percentiles[1]),
+                'best_median': float(percentiles[2]),
+                'best_mean': float(scores.mean()) if len(scores) else np.nan,
+                'best_p90': float(percentiles[3]),
+                'best_max': float(percentiles[4]),
+                'changed': int((best_match[:, c] != best_match[:, 0]).sum()),
+            })
+        return summaries
+
+    @_profiled("add_profiles")
+    def add_profiles(self, df_new):
+        """
+        Appends late sign-ups (a cleaned DataFrame, as from DataLoader) without a full rerun.
+        Only the new rows and columns are scored: cached score matrices are extended, and if
+        find_ideal_matches has run, an existing user's best match changes only where a newcomer
+        scores strictly higher (so ties keep the earlier partner, as a full rerun would).
+
+        Returns {id: (best_match_id, score)} for the new users and every user whose match changed
+        ({} if find_ideal_matches has not run yet).
+        """
+        clash = set(df_new.index) & set(self.positions)
+        if clash:
+            raise ValueError(f"Profiles already loaded: {sorted(clash)[:5]}")
+
+        n_old = len(self.ids)
+        self.df = pd.concat([self.df, df_new])
+        self.ids = self.df.index.tolist()
+        self.positions = {uid: i for i, uid in enumerate(self.ids)}
+        # Only the new rows are encoded; multi-select bitsets widen if new options appeared
+        added = self.encode_profiles(df_new)
+        for key, value in self.features.items():
+            if key == 'weights':
+                added[key] = value
+            elif isinstance(value, tuple):
+                bits, new_bits = value[0], added[key][0]
+                bits = np.pad(bits, ((0, 0), (0, new_bits.shape[1] - bits.shape[1])))
+                added[key] = (np.concatenate([bits, new_bits]), np.concatenate([value[1], added[key][1]]))
+            else:
+                added[key] = np.concatenate([value, added[key]])
+        self.features = added
+        self.blocks = BlockingIndex(self.features)
+        self._stat_index = None
+        self._pair_store = None
+
+        n = len(self.ids)
+        old_rows, new_rows, all_rows = np.arange(n_old), np.arange(n_old, n), np.arange(n)
+        for mode, old in list(self._score_matrices.items()):
+            scores = np.empty((n, n), dtype=np.float64)
+            scores[:n_old, :n_old] = old
+            scores[:n_old, n_old:] = _score_block(self.features, old_rows, new_rows, mode, self.profiler)
+            scores[n_old:] = _score_block(self.features, new_rows, all_rows, mode, self.profiler)
+            self._score_matrices[mode] = scores
+
+        if self._ideal is None:
+            return {}
+
+        best_match = np.concatenate([self._ideal[0], np.full(n - n_old, -1)])
+        best_score = np.concatenate([self._ideal[1], np.full(n - n_old, -np.inf)])
+        changed = []
+        if n_old and n > n_old:
+            block = _score_block(self.features, old_rows, new_rows, "romantic", self.profiler)
+            block[~_hard_compatible(self.features, old_rows, new_rows, "romantic")] = -np.inf
+            best = block.argmax(axis=1)
+            candidate = block[old_rows, best]
+            better = candidate > best_score[:n_old]
+            best_match[:n_old][better] = new_rows[best[better]]
+            best_score[:n_old][better] = candidate[better]
+            changed = old_rows[better].tolist()
+        new_match, new_score = _best_matches(self.features, self.blocks, n_old, n, "romantic", self.profiler)
+        best_match[n_old:], best_score[n_old:] = new_match, new_score
+        self._ideal = (best_match, best_score)
+        return self._matches_dict(changed + new_rows.tolist())
+
+    @_profiled("top_k_all")
+    def top_k_all(self, k=5, mode="romantic"):
+        """
+        Top-k partners for every user as {id: [(other_id, score)]}, by full blocked scan
+        (sharded over `workers` processes if > 1). Same ordering as top_k.
+        """
+        if self.workers > 1:
+            with ShardedScorer(self.features, self.workers, self.profiler) as pool:
+                top_pos, top_val = pool.top_k(k, mode)
+        else:
+            top_pos, top_val = _top_k_rows(self.features, self.blocks, 0, len(self.ids), k, mode, self.profiler)
+        return {uid: [(self.ids[p], float(s)) for p, s in zip(top_pos[i], top_val[i]) if p >= 0]
+                for i, uid in enumerate(self.ids)}
+
+    @_profiled("group_fit")
+    def group_fit_sums(self, member_ids, mode="friend"):
+        """
+        For every user, the sum of calculate_score(user, member, mode) over `member_ids`
+        (added in order). Sharded over `workers` processes if > 1.
+        """
+        members = [self.positions[m] for m in member_ids]
+        if self.workers > 1:
+            with ShardedScorer(self.features, self.workers, self.profiler) as pool:
+                return pool.group_fit_sums(members, mode)
+        return _group_fit_rows(self.features, 0, len(self.ids), members, mode, self.profiler)
+
+    @_profiled("groups")
     def find_groups(self):
         """
         Generates Groups of ~5 (updated code says 10, keeping logic same).
+
+        Group fit is the average friend score with all current members. Every candidate
+        carries a running score sum and a running "grade-valid with every member" flag;
+        when a member joins both are updated with one column of scores (O(N)), and the
+        next member is a single argmax over the valid, unassigned candidates.
         """
         # --- 2. Groups ---
         print("\nForming Groups of 10...")
+        n = len(self.ids)
         # Greedy approach
-        unassigned = set(self.ids)
+        unassigned = np.ones(n, dtype=bool)
         groups = []
         target_group_size = 10
         
-        while len(unassigned) > 0:
-            if len(unassigned) < target_group_size:
+        while unassigned.any():
+            remaining = np.flatnonzero(unassigned)
+            if len(remaining) < target_group_size:
                 # Add remainder to last group if it exists
                 if groups:
-                    groups[-1].extend(list(unassigned))
+                    groups[-1].extend(self.ids[i] for i in remaining)
                 else:
-                    groups.append(list(unassigned)) # Just one small group
+                    groups.append([self.ids[i] for i in remaining]) # Just one small group
                 break
                 
-            # Start new group with random person
-            seed = list(unassigned)[0]
-            unassigned.remove(seed)
-            current_group = [seed]
+            # Start new group with the first unassigned person
+            group_sum = np.zeros(n)
+            # Enforce Strict Adjacency with ALL existing members to prevent a chain like Fr-So-Jr where Fr and Jr shouldn't mix.
+            grade_valid = np.ones(n, dtype=bool)
+            current_group = []
+
+            def add_member(pos):
+                unassigned[pos] = False
+                current_group.append(self.ids[pos])
+                # calculate_score(candidate, member, mode="friend") for every candidate at once
+                # Only candidates in a bucket compatible with every member so far stay valid
+                in_block = np.zeros(n, dtype=bool)
+                in_block[self.blocks.candidates(self.blocks.key_of(pos), "friend")] = True
+                grade_valid[:] &= in_block
+                live = np.flatnonzero(grade_valid & unassigned)
+                if "friend" in self._score_matrices:
+                    self.profiler.count('score_matrix_cache_hits')
+                    group_sum[live] += self._score_matrices["friend"][live, pos]
+                elif len(live):
+                    group_sum[live] += _score_block(self.features, live, [pos], "friend", self.profiler)[:, 0]
+
+            add_member(remaining[0])
             
-            while len(current_group) < target_group_size and unassigned:
+            while len(current_group) < target_group_size:
                 # Find best fit for the *current group*
-                # We can define group fit as average score with all current members
-                best_candidate = None
-                best_group_score = -float('inf')
-                
-                for candidate in unassigned:
-                    # Group constraint: Grade adjacency with EVERYONE in group? 
-                    # Or just generally consistent? 
-                    # Let's enforce Strict Adjacency with ALL existing members to prevent a chain like Fr-So-Jr where Fr and Jr shouldn't mix.
-                    
-                    valid_candidate = True
-                    total_score = 0
-                    
-                    for member in current_group:
-                        # Check grade
-                        if not self.get_grade_compatibility(self.df.loc[candidate]['year'], self.df.loc[member]['year']):
-                            valid_candidate = False
-                            break
-                        
-                        # Score (use 'friend' mode or just skip orientation check)
-
-                        # We reuse calculate_score but maybe we shouldn't punish orientation mismatch for groups
-                        # Let's use mode="friend" (logic below)
-                        
-                        # Calculating score manually for friend context (skipping orientation check inside score function logic if we tweaked it)
-                        # Actually calculate_score does -1000 for orientation only if mode="romantic".
-                        # So let's call it with mode="friend"
-                        
-                        s = self.calculate_score(candidate, member, mode="friend")
-                        total_score += s
-                        
-                    if valid_candidate:
-                        avg_score = total_score / len(current_group)
-                        if avg_score > best_group_score:
-                            best_group_score = avg_score
-                            best_candidate = candidate
-                            
-                if best_candidate:
-                    current_group.append(best_candidate)
-                    unassigned.remove(best_candidate)
-                else:
+                candidates = unassigned & grade_valid
+                if not candidates.any():
                     # No valid candidates found for this group (maybe isolated by grade)
-                    break 
+                    break
+                if self.profiler.enabled:
+                    self.profiler.count('group_slots')
+                    self.profiler.count('group_candidates_scanned', candidates.sum())
+                avg_score = np.where(candidates, group_sum / len(current_group), -np.inf)
+                add_member(int(avg_score.argmax())) # First best, same tie-break as a left-to-right scan
             
             groups.append(current_group)
 
         return groups
 
-    def generate_report(self, matches, groups):
-        print("\n" + "="*40)
-        print("          MATCHING REPORT")
-        print("="*40)
-        
-        print("\n--- IDEAL PAIR MATCHES ---")
-        for idx, (match_idx, score) in matches.items():
-            user = self.df.loc[idx]
-            if match_idx is not None:
-                match = self.df.loc[match_idx]
-                print(f"{user['name']} ({user['year']}) <--> {match['name']} ({match['year']}) [Score: {score:.1f}]")
+    @_profiled("mutual_matches")
+    def find_mutual_matches(self, candidate_k=MUTUAL_CANDIDATES):
+        """
+        One-to-one pairing maximizing the total symmetrized score (s(a, b) + s(b, a)) / 2.
+
+        Every user keeps their top `candidate_k` hard-compatible partners, which gives a
+        sparse undirected candidate graph. Each connected component of that graph is solved
+        exactly with Edmonds' blossom algorithm (networkx.max_weight_matching), so the result
+        is the optimal pairing over the candidate graph. With candidate_k >= N - 1 the
+        candidate graph is the full hard-compatible graph and the result is the global optimum.
+
+        Returns a dict with 'pairs' [(id_a, id_b, score)], 'objective' and 'unpaired'.
+        """
+        import networkx as nx
+
+        print("\nCalculating Mutual Matches...")
+        src_idx, dst_idx, weights = self._mutual_candidate_graph(candidate_k)
+
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(zip(src_idx.tolist(), dst_idx.tolist(), weights.tolist()))
+
+        pairs = []
+        for component in nx.connected_components(graph):
+            subgraph = graph.subgraph(component)
+            if len(component) == 2:
+                pairs.append(tuple(component))
             else:
-                print(f"{user['name']} ({user['year']}) <--> NO COMPATIBLE MATCH FOUND")
+                pairs.extend(nx.max_weight_matching(subgraph))
 
-        print("\n\n--- GROUPS ---")
-        for i, grp in enumerate(groups):
-            print(f"\nGroup {i+1}:")
-            member_names = [f"{self.df.loc[uid]['name']} ({self.df.loc[uid]['year']})" for uid in grp]
-            for name in member_names:
-                print(f"  - {name}")
-
-    def generate_ranked_report(self, matches):
-        print("\n" + "="*40)
-        print("      RANKED PAIR MATCHES REPORT")
-        print("="*40)
-        
-        # Convert matches dict to a list of unique pairs to avoid duplicates A-B and B-A?
-        # Actually user might want to see valid matches for *everyone*, even if asymmetric scores (though symmetric here)
-        # But usually "match" implies bidirectional. 
-        # The current logic: matches[A] = Best for A.
-        # It's possible A's best is B, but B's best is C.
-        # "Print pair matches" -> Let's list everyone's best match, ranked by the score.
-        
-        # Structure: list of (user_idx, match_idx, score)
-        ranked_list = []
-        for idx, (match_idx, score) in matches.items():
-            ranked_list.append((idx, match_idx, score))
-            
-        # Sort by score descending
-        ranked_list.sort(key=lambda x: x[2], reverse=True)
-        
-        for idx, match_idx, score in ranked_list:
-            user = self.df.loc[idx]
-            user_name = f"{user['name']} ({user['year']})"
-            
+        paired = set()
+        result_pairs = []
+        for a, b in pairs:
+            a, b = min(a, b), max(a, b)
+            paired.update((a, b))
+            result_pairs.append((self.ids[a], self.ids[b], graph[a][b]['weight']))
+        result_pairs.sort(key=lambda p: (self.positions[p[0]], self.positions[p[1]]))
+
+        return {
+            'pairs': result_pairs,
+            'objective': sum(s for _, _, s in result_pairs),
+            'unpaired': [uid for i, uid in enumerate(self.ids) if i not in paired],
+        }
+
+    @_profiled("rounds")
+    def schedule_rounds(self, rounds, candidate_k=None, met=(), sit_outs=None, attendees=None):
+        """
+        Speed-dating schedule: `rounds` one-to-one pairings in which nobody meets the same
+        partner twice and every pair passes the hard constraints.
+
+        Each round is solved on the mutual candidate graph (every user's top `candidate_k`
+        partners by symmetrized score, reusing a cached score matrix or pair store). Anyone
+        who has sat out more often is served first: each earlier sit-out adds SIT_OUT_PRIORITY
+        to their edges, which outweighs any score difference. Small rounds (up to
+        EXACT_MATCHING_NODES attendees with candidates) get the maximum-cardinality optimum;
+        larger ones are solved greedily with augmenting paths (see _greedy_matching), which
+        takes about a second per round for a few thousand attendees.
+
+        To re-plan mid-event, pass the pairs already `met` ([(id_a, id_b)]), the `sit_outs` so far
+        ({id: count}) and the `attendees` still present (default: everyone).
+
+        Returns a dict with 'rounds' [{'pairs': [(id_a, id_b, score)], 'sitting_out': [ids]}],
+        'objective' (total mutual score) and 'sit_outs' {id: count}.
+        """
+        print("\nScheduling Rounds...")
+        n = len(self.ids)
+        candidate_k = candidate_k or max(MUTUAL_CANDIDATES, 2 * rounds)
+        src, dst, weight = self._mutual_candidate_graph(candidate_k)
+
+        present = np.ones(n, dtype=bool) if attendees is None else np.isin(np.arange(n), [self.positions[uid] for uid in attendees])
+        available = present[src] & present[dst]
+        met = {(min(self.positions[a], self.positions[b]), max(self.positions[a], self.positions[b])) for a, b in met}
+        if met:
+            available &= np.array([(a, b) not in met for a, b in zip(src.tolist(), dst.tolist())], dtype=bool)
+        sat = np.zeros(n)
+        for uid, count in (sit_outs or {}).items():
+            sat[self.positions[uid]] = count
+
+        schedule = []
+        for _ in range(rounds):
+            edges = np.flatnonzero(available)
+            priority = weight[edges] + SIT_OUT_PRIORITY * (sat[src[edges]] + sat[dst[edges]])
+            if len(np.union1d(src[edges], dst[edges])) <= EXACT_MATCHING_NODES:
+                mate = _exact_matching(src[edges], dst[edges], priority, n)
+            else:
+                mate = _greedy_matching(src[edges], dst[edges], priority, n)
+
+            # Mark this round's pairs as used
+            pair_edges = edges[mate[src[edges]] == dst[edges]]
+            available[pair_edges] = False
+            sitting = np.flatnonzero(present & (mate < 0))
+            sat[sitting] += 1
+            schedule.append({
+                'pairs': [(self.ids[a], self.ids[b], float(w)) for a, b, w in zip(src[pair_edges].tolist(), dst[pair_edges].tolist(), weight[pair_edges])],
+                'sitting_out': [self.ids[i] for i in sitting],
+            })
+            self.profiler.count('round_pairs', len(pair_edges))
+
+        return {
+            'rounds': schedule,
+            'objective': sum(s for r in schedule for _, _, s in r['pairs']),
+            'sit_outs': {self.ids[i]: int(sat[i]) for i in np.flatnonzero(sat)},
+        }
+
+    def _mutual_candidate_graph(self, candidate_k):
+        """
+        Undirected sparse graph of each user's top-k compatible partners by symmetrized score.
+        Returns (src, dst, weight) arrays with src < dst for every edge. Only pairs from
+        compatible blocking buckets are scored, both directions at once (read from the cached
+        romantic score_matrix or the pair store when either exists).
+        """
+        cached = self._score_matrices.get("romantic")
+        self.profiler.count('score_matrix_cache_hits' if cached is not None else 'score_matrix_cache_misses')
+
+        def both_ways(rows, cols):
+            if cached is not None:
+                return cached[np.ix_(rows, cols)], cached[np.ix_(cols, rows)].T
+            if self._pair_store is not None:
+                return self._pair_store.pair_scores(rows, cols, "romantic")
+            return _pair_block(self.features, rows, cols, "romantic", self.profiler)
+
+        src_parts, dst_parts, weight_parts = [], [], []
+        for key, bucket in self.blocks.buckets.items():
+            cols = self.blocks.candidates(key, "romantic")
+            k = min(candidate_k, len(cols))
+            if k <= 0:
+                continue
+            for start in range(0, len(bucket), SCORE_BLOCK_ROWS):
+                rows = bucket[start:start + SCORE_BLOCK_ROWS]
+                forward, backward = both_ways(rows, cols)
+                mutual = (forward + backward) / 2
+                mutual[rows[:, None] == cols[None, :]] = -np.inf
+
+                top = np.argpartition(-mutual, k - 1, axis=1)[:, :k]
+                top_weights = np.take_along_axis(mutual, top, axis=1)
+                keep = np.isfinite(top_weights)
+                src_parts.append(np.repeat(rows, k)[keep.ravel()])
+                dst_parts.append(cols[top[keep]])
+                weight_parts.append(top_weights[keep])
+
+        if not src_parts:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.intp), np.array([])
+
+        # Undirected edge set without duplicates; the weight is the same in both directions
+        src = np.concatenate(src_parts)
+        dst = np.concatenate(dst_parts)
+        edges, first = np.unique(np.stack([np.minimum(src, dst), np.maximum(src, dst)], axis=1), axis=0, return_index=True)
+        return edges[:, 0], edges[:, 1], np.concatenate(weight_parts)[first]
+
+    @_profiled("report")
+    def generate_report(self, matches, groups, out=None, fmt="text"):
+        ReportWriter(self, fmt).write_report(out or sys.stdout, matches, groups)
+
+    @_profiled("report")
+    def generate_ranked_report(self, matches, out=None, fmt="text"):
+        ReportWriter(self, fmt).write_ranked(out or sys.stdout, matches)
+
+    @_profiled("report")
+    def generate_mutual_report(self, result, out=None, fmt="text"):
+        ReportWriter(self, fmt).write_mutual(out or sys.stdout, result)
+
+    @_profiled("report")
+    def generate_rounds_report(self, result, out=None, fmt="text"):
+        ReportWriter(self, fmt).write_rounds(out or sys.stdout, result)
+
+
+class ReportWriter:
+    """
+    Writes match, group and mutual-pair reports as text (the classic console layout), CSV or
+    JSON Lines. Names and years are gathered into lists once, rankings are sorted with NumPy,
+    and output is written in buffered chunks instead of one print per line.
+    """
+    FORMATS = ("text", "csv", "jsonl")
+    CSV_COLUMNS = ['record', 'rank', 'group', 'user_id', 'user_name', 'user_year',
+                   'match_id', 'match_name', 'match_year', 'score', 'round']
+    CHUNK_LINES = 10000
+
+    def __init__(self, matcher, fmt="text"):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown report format {fmt!r}; expected one of {self.FORMATS}")
+        self.fmt = fmt
+        self.ids = matcher.ids
+        self.positions = matcher.positions
+        self.names = matcher.df['name'].tolist()
+        self.years = matcher.df['year'].tolist()
+        self.labels = [f"{name} ({year})" for name, year in zip(self.names, self.years)]
+
+    @staticmethod
+    def format_for(path):
+        """
+        Report format implied by a file name (.csv, .jsonl / .ndjson, anything else is text).
+        """
+        ext = os.path.splitext(path)[1].lower()
+        return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(ext, 'text')
+
+    # --- Output plumbing ---
+    def _emit(self, out, records, header=()):
+        """
+        Writes an iterable of lines (text) or record dicts (csv / jsonl) to `out` in chunks.
+        """
+        if self.fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=self.CSV_COLUMNS, extrasaction='ignore', lineterminator='\n')
+            writer.writeheader()
+            for i, record in enumerate(records, 1):
+                writer.writerow(record)
+                if i % self.CHUNK_LINES == 0:
+                    out.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+            out.write(buffer.getvalue())
+            return
+
+        chunk = list(header) if self.fmt == "text" else []
+        for item in records:
+            chunk.append(item if self.fmt == "text" else json.dumps(item))
+            if len(chunk) >= self.CHUNK_LINES:
+                out.write("\n".join(chunk) + "\n")
+                chunk = []
+        if chunk:
+            out.write("\n".join(chunk) + "\n")
+
+    def _record(self, record, pos_a, pos_b=None, score=None, **extra):
+        row = {'record': record, 'user_id': self._id(pos_a), 'user_name': self.names[pos_a], 'user_year': self._year(pos_a)}
+        if pos_b is not None:
+            row.update({'match_id': self._id(pos_b), 'match_name': self.names[pos_b], 'match_year': self._year(pos_b)})
+        else:
+            row.update({'match_id': None, 'match_name': None, 'match_year': None})
+        row['score'] = None if score is None or not np.isfinite(score) else float(score)
+        row.update(extra)
+        return row
+
+    def _id(self, pos):
+        uid = self.ids[pos]
+        return uid.item() if isinstance(uid, np.generic) else uid
+
+    def _year(self, pos):
+        year = self.years[pos]
+        return None if pd.isna(year) else int(year)
+
+    @staticmethod
+    def _banner(title):
+        return ["", "=" * 40, title, "=" * 40]
+
+    # --- Reports ---
+    def write_report(self, out, matches, groups):
+        """
+        Everyone's ideal match (in id order) followed by the groups.
+        """
+        pos = self.positions
+        if self.fmt != "text":
+            records = [self._record('match', pos[uid], None if m is None else pos[m], s) for uid, (m, s) in matches.items()]
+            records += [self._record('group', pos[uid], group=g + 1) for g, grp in enumerate(groups) for uid in grp]
+            self._emit(out, records)
+            return
+
+        labels = self.labels
+        lines = self._banner("          MATCHING REPORT") + ["", "--- IDEAL PAIR MATCHES ---"]
+        for uid, (match_idx, score) in matches.items():
             if match_idx is not None:
-                match = self.df.loc[match_idx]
-                match_name = f"{match['name']} ({match['year']})"
-                print(f"[{score:.1f}] {user_name} <--> {match_name}")
+                lines.append(f"{labels[pos[uid]]} <--> {labels[pos[match_idx]]} [Score: {score:.1f}]")
             else:
-                print(f"[{score:.1f}] {user_name} <--> NO MATCH")
+                lines.append(f"{labels[pos[uid]]} <--> NO COMPATIBLE MATCH FOUND")
+        lines += ["", "", "--- GROUPS ---"]
+        for i, grp in enumerate(groups):
+            lines += ["", f"Group {i+1}:"]
+            lines += [f"  - {labels[pos[uid]]}" for uid in grp]
+        self._emit(out, lines)
+
+    def write_ranked(self, out, matches):
+        """
+        Everyone's best match, ranked by score (descending, ties kept in id order).
+        """
+        pos = self.positions
+        users = list(matches)
+        scores = np.array([matches[uid][1] for uid in users], dtype=np.float64)
+        order = np.argsort(-scores, kind='stable')
+
+        if self.fmt != "text":
+            records = []
+            for rank, i in enumerate(order.tolist(), 1):
+                match_idx, score = matches[users[i]]
+                records.append(self._record('ranked_match', pos[users[i]], None if match_idx is None else pos[match_idx], score, rank=rank))
+            self._emit(out, records)
+            return
+
+        labels = self.labels
+        lines = []
+        for i in order.tolist():
+            match_idx, score = matches[users[i]]
+            match_name = labels[pos[match_idx]] if match_idx is not None else "NO MATCH"
+            lines.append(f"[{score:.1f}] {labels[pos[users[i]]]} <--> {match_name}")
+        self._emit(out, lines, header=self._banner("      RANKED PAIR MATCHES REPORT"))
+
+    def write_mutual(self, out, result):
+        """
+        One-to-one pairs ranked by mutual score, then everyone left unpaired.
+        """
+        pos = self.positions
+        pairs = result['pairs']
+        order = np.argsort(-np.array([s for _, _, s in pairs], dtype=np.float64), kind='stable')
+
+        if self.fmt != "text":
+            records = [self._record('mutual_pair', pos[pairs[i][0]], pos[pairs[i][1]], pairs[i][2], rank=rank)
+                       for rank, i in enumerate(order.tolist(), 1)]
+            records += [self._record('unpaired', pos[uid]) for uid in result['unpaired']]
+            self._emit(out, records)
+            return
+
+        labels = self.labels
+        lines = self._banner("       MUTUAL PAIR MATCHES REPORT")
+        lines += [f"Pairs: {len(pairs)}  Objective: {result['objective']:.1f}", ""]
+        for i in order.tolist():
+            idx_a, idx_b, score = pairs[i]
+            lines.append(f"[{score:.1f}] {labels[pos[idx_a]]} <--> {labels[pos[idx_b]]}")
+        lines += ["", f"--- UNPAIRED ({len(result['unpaired'])}) ---"]
+        lines += [f"  - {labels[pos[uid]]}" for uid in result['unpaired']]
+        self._emit(out, lines)
+
+    def write_rounds(self, out, result):
+        """
+        Every round's pairs (by position) and who sits it out.
+        """
+        pos = self.positions
+        if self.fmt != "text":
+            records = []
+            for number, rnd in enumerate(result['rounds'], 1):
+                records += [self._record('round_pair', pos[a], pos[b], s, round=number) for a, b, s in rnd['pairs']]
+                records += [self._record('sitting_out', pos[uid], round=number) for uid in rnd['sitting_out']]
+            self._emit(out, records)
+            return
+
+        labels = self.labels
+        lines = self._banner("       SPEED DATING ROUNDS REPORT")
+        lines.append(f"Rounds: {len(result['rounds'])}  Objective: {result['objective']:.1f}")
+        for number, rnd in enumerate(result['rounds'], 1):
+            lines += ["", f"--- ROUND {number} ({len(rnd['pairs'])} pairs) ---"]
+            lines += [f"[{score:.1f}] {labels[pos[a]]} <--> {labels[pos[b]]}" for a, b, score in rnd['pairs']]
+            lines.append(f"  Sitting out ({len(rnd['sitting_out'])}): " + ", ".join(labels[pos[uid]] for uid in rnd['sitting_out']))
+        self._emit(out, lines)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Matchmaking Algorithm")
     parser.add_argument('--rank-pairs', action='store_true', help="Print only ranked pair matches")
+    parser.add_argument('--mutual', action='store_true', help="Print a one-to-one pairing maximizing total mutual score")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for pair scoring (default: %(default)s)")
+    parser.add_argument('--snapshot-dir', help="Directory for a binary snapshot of the cleaned export, reused while data.csv is unchanged")
+    parser.add_argument('--cache-dir', help="Directory for memory-mapped score matrices, reused while data.csv and the scoring rules are unchanged")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='PATH', help="Write per-phase timings and counters as JSON to PATH (stderr if omitted)")
+    parser.add_argument('--out', help="Write the report to this file instead of stdout")
+    parser.add_argument('--format', choices=ReportWriter.FORMATS, help="Report format (default: from the --out extension, else text)")
+    parser.add_argument('--pair-store', action='store_true', help="Precompute both directions of every pair once (about 6 bytes per directed pair) and read matches from it")
+    parser.add_argument('--rounds', type=int, metavar='R', help="Print an R-round speed-dating schedule (no repeated pairs, fair sit-outs)")
+    parser.add_argument('--follow', type=float, metavar='SECONDS', help="After the report, poll data.csv every SECONDS for appended rows and print the matches they change")
+    parser.add_argument('--weights', metavar='PATH', help="JSON file overriding scoring weights (keys of DEFAULT_WEIGHTS)")
+    parser.add_argument('--candidates', type=int, help=f"Top partners kept per user for --mutual / --rounds (default: {MUTUAL_CANDIDATES}, at least 2 * R for --rounds)")
     args = parser.parse_args()
 
+    profiler = Profiler() if args.profile else None
     loader = DataLoader('data.csv')
-    df = loader.load_and_clean()
+    with (profiler or NULL_PROFILER).phase("load"):
+        df = loader.load_and_clean(columns=MATCH_COLS, snapshot_dir=args.snapshot_dir)
     
-    matcher = Matcher(df)
+    matcher = Matcher(df, workers=args.workers, cache_dir=args.cache_dir, profiler=profiler, weights=args.weights)
+    if args.cache_dir:
+        for mode in ("romantic", "friend"):
+            matcher.score_matrix(mode=mode)
+    if args.pair_store:
+        matcher.build_pair_store()
     
-    if args.rank_pairs:
-        matches = matcher.find_ideal_matches()
-        matcher.generate_ranked_report(matches)
-    else:
-        # Default behavior
-        matches = matcher.find_ideal_matches()
-        groups = matcher.find_groups()
-        matcher.generate_report(matches, groups)
+    fmt = args.format or (ReportWriter.format_for(args.out) if args.out else "text")
+    out = open(args.out, 'w', newline='', buffering=1 << 20) if args.out else sys.stdout
+    try:
+        if args.rounds:
+            result = matcher.schedule_rounds(args.rounds, candidate_k=args.candidates)
+            matcher.generate_rounds_report(result, out, fmt)
+        elif args.mutual:
+            result = matcher.find_mutual_matches(candidate_k=args.candidates or MUTUAL_CANDIDATES)
+            matcher.generate_mutual_report(result, out, fmt)
+        elif args.rank_pairs:
+            matches = matcher.find_ideal_matches()
+            matcher.generate_ranked_report(matches, out, fmt)
+        else:
+            # Default behavior
+            matches = matcher.find_ideal_matches()
+            groups = matcher.find_groups()
+            matcher.generate_report(matches, groups, out, fmt)
+
+        if args.follow:
+            if matcher._ideal is None:
+                matcher.find_ideal_matches()
+            try:
+                while True:
+                    out.flush()
+                    time.sleep(args.follow)
+                    rows, reloaded = loader.poll()
+                    if reloaded:
+                        matcher = Matcher(rows, workers=args.workers, cache_dir=args.cache_dir, profiler=profiler, weights=args.weights)
+                        changed = matcher.find_ideal_matches()
+                    elif len(rows):
+                        print(f"{len(rows)} new profiles.")
+                        changed = matcher.add_profiles(rows)
+                    else:
+                        continue
+                    matcher.generate_ranked_report(changed, out, fmt)
+            except KeyboardInterrupt:
+                pass
+    finally:
+        if args.out:
+            out.close()
+
+    if profiler:
+        if args.profile == '-':
+            print(profiler.to_json(), file=sys.stderr)
+        else:
+            with open(args.profile, 'w') as f:
+                f.write(profiler.to_json() + "\n")
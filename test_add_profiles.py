@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher
+
+# Late sign-ups: the last 20 rows of the export arrive after the first run
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+early, late = df.iloc[:-20], df.iloc[-20:].copy()
+late.loc[late.index[0], 'music'] = 'Polka, Pop' # An option nobody picked before
+late.loc[late.index[1], 'politics'] = 'Anarchist'
+
+full = Matcher(pd.concat([early, late]))
+expected = full.find_ideal_matches()
+
+matcher = Matcher(early)
+before = matcher.find_ideal_matches()
+matcher.score_matrix(mode="friend")
+updated = matcher.add_profiles(late)
+
+print("\n--- Testing add_profiles against a full rerun ---")
+
+passed = True
+checks = [
+    ("ideal matches", expected, matcher._matches_dict(range(len(matcher.ids)))),
+    ("reported updates", {uid: expected[uid] for uid in expected if uid in late.index or before.get(uid) != expected[uid]}, updated),
+    ("extended friend matrix", True, np.array_equal(matcher.score_matrix(mode="friend"), full.score_matrix(mode="friend"))),
+]
+for name, want, got in checks:
+    status = "PASS" if want == got else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+try:
+    matcher.add_profiles(late.iloc[:1])
+    print("duplicate ids rejected: FAIL")
+    passed = False
+except ValueError:
+    print("duplicate ids rejected: PASS")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
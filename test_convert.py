@@ -0,0 +1,47 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+from convert import convert_csv_to_json
+
+# merged_preferences.csv is the source of the checked-in responses.json
+workdir = tempfile.mkdtemp()
+whole = os.path.join(workdir, 'whole.json')
+chunked = os.path.join(workdir, 'chunked.json')
+lines = os.path.join(workdir, 'lines.jsonl')
+
+with contextlib.redirect_stdout(io.StringIO()):
+    convert_csv_to_json('merged_preferences.csv', whole)
+    convert_csv_to_json('merged_preferences.csv', chunked, chunksize=7) # Users straddle chunk boundaries
+    convert_csv_to_json('merged_preferences.csv', lines)
+
+with open('responses.json', encoding='utf-8') as f:
+    expected = f.read()
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+print("--- Testing convert.py ---")
+
+passed = True
+records = {}
+for line in read(lines).splitlines():
+    record = json.loads(line)
+    records[record['User_ID']] = record['responses']
+
+checks = [
+    ("json identical to json.dump output", read(whole) == expected),
+    ("chunked json identical", read(chunked) == expected),
+    ("jsonl holds the same users", list(records.items()) == list(json.loads(expected).items())),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
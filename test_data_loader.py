@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher, MATCH_COLS
+
+# Copy of the export with a row missing its year, answers and stats
+workdir = tempfile.mkdtemp()
+csv_path = os.path.join(workdir, 'data.csv')
+raw = pd.read_csv('data.csv')
+blank = {col: np.nan for col in raw.columns}
+blank['Name (First + Last)'] = 'Blank Row'
+pd.concat([raw, pd.DataFrame([blank])], ignore_index=True).to_csv(csv_path, index=False)
+snapshot_dir = os.path.join(workdir, 'snapshots')
+
+full = DataLoader(csv_path).load_and_clean()[MATCH_COLS]
+projected = DataLoader(csv_path).load_and_clean(columns=MATCH_COLS)
+written = DataLoader(csv_path).load_and_clean(columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+files = sorted(os.listdir(snapshot_dir))
+reloaded = DataLoader(csv_path).load_and_clean(columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+files_after = sorted(os.listdir(snapshot_dir))
+
+def same_frame(a, b):
+    return list(a.columns) == list(b.columns) and a.index.equals(b.index) and all(
+        a[c].astype(object).equals(b[c].astype(object)) for c in a.columns)
+
+def same_features(a, b):
+    fa, fb = Matcher(a).features, Matcher(b).features
+    flat = lambda v: v[0] if isinstance(v, tuple) else v
+    return all(np.array_equal(flat(fa[k]), flat(fb[k]), equal_nan=flat(fa[k]).dtype.kind == 'f') for k in fa)
+
+print("\n--- Testing DataLoader projection and snapshots ---")
+
+passed = True
+os.utime(csv_path, ns=(os.stat(csv_path).st_atime_ns, os.stat(csv_path).st_mtime_ns + 10**9))
+DataLoader(csv_path).load_and_clean(columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+
+checks = [
+    ("projected load equals full load", same_frame(full, projected)),
+    ("enumerated answers are categorical", isinstance(projected['gender'].dtype, pd.CategoricalDtype)),
+    ("snapshot round trip", same_frame(projected, reloaded) and same_frame(written, reloaded)),
+    ("snapshot reused", len(files) == 1 and files_after == files),
+    ("touched export gets a new snapshot", len(os.listdir(snapshot_dir)) == 2),
+    ("same encoded features", same_features(full, reloaded)),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+shutil.rmtree(workdir)
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+from smart_match import DataLoader, Matcher, MATCH_COLS
+
+# A copy of the export (which, like Google Forms downloads, has no trailing newline) to append to
+workdir = tempfile.mkdtemp()
+csv_path = os.path.join(workdir, 'data.csv')
+shutil.copy('data.csv', csv_path)
+raw = pd.read_csv('data.csv')
+
+def new_rows(start, n, timestamp="3/1/2026 10:00:00"):
+    rows = raw.iloc[start:start + n].copy()
+    rows['Timestamp'] = timestamp
+    rows['Name (First + Last)'] = [f"Late {i}" for i in range(start, start + n)]
+    return rows.to_csv(header=False, index=False, lineterminator='\n')
+
+def append(text):
+    with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+def full_load():
+    return quiet(DataLoader(csv_path).load_and_clean, columns=MATCH_COLS)
+
+def same_frame(a, b):
+    return list(a.columns) == list(b.columns) and a.index.equals(b.index) and all(
+        a[c].astype(object).equals(b[c].astype(object)) for c in a.columns)
+
+print("--- Testing DataLoader follow mode ---")
+
+loader = DataLoader(csv_path)
+df = quiet(loader.load_and_clean, columns=MATCH_COLS)
+matcher = Matcher(df)
+quiet(matcher.find_ideal_matches)
+checks = []
+
+rows, reloaded = loader.poll()
+checks.append(("unchanged export polls empty", len(rows) == 0 and not reloaded))
+
+append("\n" + new_rows(0, 5).rstrip("\n"))
+rows, reloaded = loader.poll()
+checks.append(("appended rows are the delta, cleaned like a full load", not reloaded and same_frame(rows, full_load().iloc[len(df):])))
+checks.append(("delta ids continue after the loaded rows", rows.index.tolist() == list(range(len(df), len(df) + 5))))
+quiet(matcher.add_profiles, rows)
+checks.append(("matcher fed the delta equals a fresh matcher", quiet(matcher.find_ideal_matches) == quiet(Matcher(full_load()).find_ideal_matches)))
+
+# A record still being written waits for the next poll; quoted line breaks stay inside their field
+row = new_rows(5, 1).rstrip("\n").replace("Late 5", '"Late\n5"', 1)
+append("\n" + row[:40])
+partial, _ = loader.poll()
+append(row[40:] + "\n")
+rows, reloaded = loader.poll()
+checks.append(("partial record is left for the next poll", len(partial) == 0 and len(rows) == 1 and not reloaded))
+checks.append(("quoted line break survives", rows['name'].iloc[0] == "Late\n5" and same_frame(rows, full_load().iloc[-1:])))
+checks.append(("checkpoint is JSON-serializable", json.loads(json.dumps(loader.checkpoint)) == loader.checkpoint))
+
+append(new_rows(6, 1, timestamp="1/1/2020 10:00:00"))
+rows, reloaded = quiet(loader.poll)
+checks.append(("timestamps going backwards trigger a full reload", reloaded and same_frame(rows, full_load())))
+
+with open(csv_path, 'rb') as f:
+    data = f.read()
+with open(csv_path, 'wb') as f:
+    f.write(data.replace(b'1/23/2026 23:09:58', b'1/23/2026 23:09:59', 1) + b'\n')
+rows, reloaded = quiet(loader.poll)
+checks.append(("rewritten export triggers a full reload", reloaded and same_frame(rows, full_load())))
+
+with open(csv_path, 'wb') as f:
+    f.write(data[:len(data) // 2].rsplit(b'\n', 1)[0])
+rows, reloaded = quiet(loader.poll)
+checks.append(("truncated export triggers a full reload", reloaded and len(rows) < len(df)))
+
+append(",extra")
+rows, reloaded = quiet(loader.poll)
+checks.append(("extending the last row triggers a full reload", reloaded))
+
+# Following resumes from a snapshot too
+snapshot_dir = os.path.join(workdir, 'snapshots')
+quiet(DataLoader(csv_path).load_and_clean, columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+follower = DataLoader(csv_path)
+quiet(follower.load_and_clean, columns=MATCH_COLS, snapshot_dir=snapshot_dir)
+append("\n" + new_rows(10, 3))
+rows, reloaded = follower.poll()
+checks.append(("following works from a snapshot", not reloaded and same_frame(rows, full_load().iloc[-3:])))
+
+shutil.rmtree(workdir)
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,44 @@
+import contextlib
+import io
+from matching import Matcher, load_user_data, create_groups
+
+# responses.json plus a user who skipped questions
+user_data = load_user_data('responses.json')
+user_data["User_Partial"] = {"What is your favorite color?": "Red", "What is your favorite season?": "Summer"}
+matcher = Matcher(user_data)
+matrix = matcher.compatibility_matrix()
+ids = list(user_data)
+
+print("--- Testing the matching.py compatibility matrix ---")
+
+passed = True
+mismatches = sum(matrix[i, j] != matcher.get_compatibility_score(user_data[a], user_data[b])
+                 for i, a in enumerate(ids) for j, b in enumerate(ids))
+
+top_mismatches = 0
+with contextlib.redirect_stdout(io.StringIO()) as quiet:
+    for user_id in ids:
+        expected = sorted(((o, matcher.get_compatibility_score(user_data[user_id], user_data[o])) for o in ids if o != user_id),
+                          key=lambda x: x[1], reverse=True)[:3]
+        top_mismatches += matcher.get_top_matches(user_id, top_n=3) != expected
+    groups = create_groups(matcher, user_data, group_size=8)
+
+with contextlib.redirect_stdout(io.StringIO()) as verbose:
+    Matcher(user_data, verbose=True).get_top_matches(ids[0])
+
+checks = [
+    (f"matrix equals get_compatibility_score ({len(ids) ** 2} pairs)", mismatches == 0),
+    ("top matches equal a full sort", top_mismatches == 0),
+    ("quiet by default", "Compatibility with" not in quiet.getvalue()),
+    ("verbose logs every pair", verbose.getvalue().count("Compatibility with") == len(ids) - 1),
+    ("groups cover everyone once", sorted(u for g in groups for u in g) == sorted(ids)),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,69 @@
+import contextlib
+import csv
+import io
+import os
+import tempfile
+from merge import merge_preference_files
+
+workdir = tempfile.mkdtemp()
+pattern = os.path.join(workdir, 'preferences_*.csv')
+output = os.path.join(workdir, 'merged.csv')
+manifest = os.path.join(workdir, 'manifest.json')
+
+def submit(name, answers):
+    with open(os.path.join(workdir, f'preferences_{name}.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Question', 'Answer'])
+        writer.writerows(answers.items())
+
+def merge():
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        merge_preference_files(pattern, output, manifest, workers=4, cleanup='no')
+    return out.getvalue()
+
+def users():
+    with open(output, newline='') as f:
+        reader = csv.DictReader(f)
+        merged = {}
+        for row in reader:
+            merged.setdefault(row['User_ID'], {}).update({q: a for q, a in row.items() if q != 'User_ID' and a})
+        return reader.fieldnames, merged
+
+print("--- Testing incremental merge.py ---")
+
+submit('a', {"What is your favorite color?": "Red", "What is your favorite season?": "Fall"})
+submit('b', {"What is your favorite color?": "Blue"})
+merge()
+_, first = users()
+
+submit('c', {"What is your favorite color?": "Green"})
+size_before = os.path.getsize(output)
+merge()
+appended = os.path.getsize(output) > size_before
+header, second = users()
+
+rerun = merge()
+
+submit('b', {"What is your favorite color?": "Teal", "Who is your favorite music artist?": "SZA"})
+merge()
+header_after, third = users()
+
+checks = [
+    ("ids by file name", first == {"User_1": {"What is your favorite color?": "Red", "What is your favorite season?": "Fall"},
+                                   "User_2": {"What is your favorite color?": "Blue"}}),
+    ("new files appended with stable ids", appended and second == dict(first, User_3={"What is your favorite color?": "Green"})),
+    ("unchanged rerun reads nothing", rerun.startswith("No new preference files")),
+    ("modified file keeps its id", third["User_2"] == {"What is your favorite color?": "Teal", "Who is your favorite music artist?": "SZA"}
+        and third["User_1"] == first["User_1"] and third["User_3"] == second["User_3"]),
+    ("header widened for a new question", header_after == ['User_ID'] + sorted(header[1:] + ["Who is your favorite music artist?"])),
+]
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
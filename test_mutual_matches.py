@@ -0,0 +1,51 @@
+from functools import lru_cache
+from smart_match import DataLoader, Matcher
+
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+
+print("--- Testing Mutual Matches ---")
+
+passed = True
+
+def check(desc, ok):
+    global passed
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{desc} -> {status}")
+
+# 1. Full export: one-to-one and every pair passes the hard constraints
+matcher = Matcher(df)
+result = matcher.find_mutual_matches()
+mask = matcher.hard_compatible_mask(mode="romantic")
+seen = [uid for a, b, _ in result['pairs'] for uid in (a, b)]
+check(f"No user in two pairs ({len(result['pairs'])} pairs)", len(seen) == len(set(seen)))
+check("Paired + unpaired covers everyone", sorted(seen + result['unpaired']) == sorted(matcher.ids))
+check("Every pair is hard-compatible", all(mask[matcher.positions[a], matcher.positions[b]] for a, b, _ in result['pairs']))
+
+# 2. Small cohort: objective equals the brute-force optimum over all pairings
+small = Matcher(df.iloc[:18])
+scores = small.score_matrix(mode="romantic")
+n = len(small.ids)
+
+@lru_cache(maxsize=None)
+def best(remaining):
+    # Optimal pairing of the users in the `remaining` bitmask: the lowest user sits out or pairs with someone
+    if remaining == 0:
+        return 0.0
+    i = (remaining & -remaining).bit_length() - 1
+    rest = remaining & ~(1 << i)
+    value = best(rest)
+    for j in range(i + 1, n):
+        if rest & (1 << j) and scores[i, j] > -500:
+            value = max(value, (scores[i, j] + scores[j, i]) / 2 + best(rest & ~(1 << j)))
+    return value
+
+expected = best((1 << n) - 1)
+small_result = small.find_mutual_matches(candidate_k=n - 1)
+check(f"Objective {small_result['objective']:.4f} == brute force {expected:.4f}", abs(small_result['objective'] - expected) < 1e-9)
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
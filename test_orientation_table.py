@@ -0,0 +1,48 @@
+from smart_match import GENDER_CATEGORIES, ORIENTATION_CATEGORIES, ORIENTATION_TABLE, profile_code
+
+# Reference: the original per-call allow-list (set of frozensets) plus the NB rules
+allowed_pairs = set()
+
+def add_pair(g1, o1, g2, o2):
+    allowed_pairs.add(frozenset({(g1, o1), (g2, o2)}))
+
+add_pair('Man', 'Straight', 'Woman', 'Straight')
+add_pair('Man', 'Bi', 'Woman', 'Straight')
+add_pair('Man', 'Bi', 'Man', 'Bi')
+add_pair('Man', 'Bi', 'Woman', 'Bi')
+add_pair('Man', 'Gay', 'Man', 'Bi')
+add_pair('Man', 'Gay', 'Man', 'Gay')
+add_pair('Woman', 'Bi', 'Man', 'Straight')
+add_pair('Woman', 'Bi', 'Woman', 'Bi')
+add_pair('Woman', 'Gay', 'Woman', 'Bi')
+add_pair('Woman', 'Gay', 'Woman', 'Gay')
+add_pair('NB', 'Bi', 'NB', 'Bi')
+
+def reference(p_a, p_b):
+    (g_a, o_a), (g_b, o_b) = p_a, p_b
+    if frozenset({p_a, p_b}) in allowed_pairs:
+        return True
+    if g_a == 'NB' and g_b == 'NB':
+        return True
+    if (g_a == 'NB' and o_b == 'Bi') or (g_b == 'NB' and o_a == 'Bi'):
+        return True
+    return False
+
+print("--- Testing ORIENTATION_TABLE against the allow-list ---")
+
+profiles = [(g, o) for g in GENDER_CATEGORIES for o in ORIENTATION_CATEGORIES]
+failures = 0
+for p_a in profiles:
+    for p_b in profiles:
+        expected = reference(p_a, p_b)
+        actual = bool(ORIENTATION_TABLE[profile_code(*p_a), profile_code(*p_b)])
+        if actual != expected:
+            failures += 1
+            print(f"{p_a} + {p_b}: Table={actual}, Expected={expected} -> FAIL")
+
+print(f"{len(profiles) ** 2} category pairs checked, {failures} mismatches")
+
+if failures == 0:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
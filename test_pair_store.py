@@ -0,0 +1,84 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher, Profiler, _pair_block, _score_block
+
+# Real export plus a few edge cases (missing year / answers, NB profiles, fractional stats)
+df = DataLoader('data.csv').load_and_clean()
+extra = pd.DataFrame({
+    'name': ['No Year', 'Blank', 'NB Queer'],
+    'year': [np.nan, 2027, 2028],
+    'gender': ['Non-binary', np.nan, 'Agender'],
+    'orientation': ['Bisexual', np.nan, 'Queer/Gay/Lesbian'],
+    'similar_preference': ['Similar', np.nan, 'Twin'],
+    'music': ['Pop', np.nan, 'Pop, Rap/Hip-hop'],
+    'weekend': [np.nan, np.nan, 'Chill'],
+    'love_language': ['Touch', np.nan, 'touch'],
+    'politics': [np.nan, np.nan, 'Moderate'],
+    'politics_preference': ['non-negotiable', np.nan, 'No'],
+    'smoking': ['Yes I smoke, I do care', np.nan, 'No'],
+    'stat_trust': [1, 3, 5], 'stat_humor': [2, 3, 4], 'stat_communication': [3, 3, 3],
+    'stat_kindness': [4, 3, 2], 'stat_looks': [5, 3, 1], 'stat_money': [1, 3, 1], 'stat_ambition': [2, 3, 5],
+})
+df = pd.concat([df, extra], ignore_index=True)
+fractional = df.astype({'stat_humor': np.float64})
+fractional.loc[0, 'stat_humor'] = 2.5
+
+print("--- Testing the two-direction pair kernel and PairStore ---")
+
+checks = []
+for label, frame in (("", df), (" (fractional stats)", fractional)):
+    matcher = Matcher(frame)
+    n = len(matcher.ids)
+    everyone = np.arange(n)
+    store = matcher.build_pair_store()
+    for mode in ("romantic", "friend"):
+        matrix = matcher.score_matrix(mode)
+        expected = matrix.copy()
+        np.fill_diagonal(expected, -np.inf)
+        forward, backward = store.pair_scores(everyone, everyone, mode)
+        kernel_forward, kernel_backward = _pair_block(matcher.features, everyone[:40], everyone, mode)
+        checks.append((f"{mode}: store forward equals score_matrix{label}", np.array_equal(forward, expected)))
+        checks.append((f"{mode}: store backward equals the transpose{label}", np.array_equal(backward, expected.T)))
+        checks.append((f"{mode}: kernel equals score_matrix both ways{label}",
+                       np.array_equal(kernel_forward, matrix[:40]) and np.array_equal(kernel_backward, matrix[:, :40].T)))
+
+matcher = Matcher(df)
+with contextlib.redirect_stdout(io.StringIO()):
+    plain_matches = matcher.find_ideal_matches()
+    plain_mutual = matcher.find_mutual_matches()
+    matcher.build_pair_store()
+    store_matches = matcher.find_ideal_matches()
+    store_mutual = matcher.find_mutual_matches()
+n = len(matcher.ids)
+checks.append(("best matches served from the store are identical", store_matches == plain_matches))
+checks.append(("mutual matches served from the store are identical", store_mutual == plain_mutual))
+checks.append(("store is under half the size of the two float64 matrices", matcher._pair_store.nbytes() < 8 * n * n))
+
+# One pass does the hard-constraint work of both directions
+profiler = Profiler()
+Matcher(df, profiler=profiler)._mutual_candidate_graph(25)
+single = Profiler()
+m = Matcher(df, profiler=single)
+for key, bucket in m.blocks.buckets.items():
+    cols = m.blocks.candidates(key, "romantic")
+    if len(cols):
+        _score_block(m.features, bucket, cols, "romantic", single)
+        _score_block(m.features, cols, bucket, "romantic", single)
+checks.append(("counters match two directed passes", profiler.counters['pairs_evaluated'] == single.counters['pairs_evaluated']))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    matcher.add_profiles(DataLoader('data.csv').load_and_clean().iloc[:3].set_axis([9001, 9002, 9003]))
+checks.append(("add_profiles drops the stale store", matcher._pair_store is None))
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher, STAT_COLS
+
+df = DataLoader('data.csv').load_and_clean()
+matcher = Matcher(df)
+feat = matcher.features
+n = len(matcher.ids)
+
+print("--- Testing the encoded profile store ---")
+
+def jaccard(a, b):
+    set_a, set_b = set(str(a).split(', ')), set(str(b).split(', '))
+    return len(set_a & set_b) / len(set_a | set_b)
+
+def store_jaccard(key, a, b):
+    bits, count = feat[key]
+    overlap = sum(int(w).bit_count() for w in bits[a] & bits[b])
+    return overlap / (int(count[a]) + int(count[b]) - overlap)
+
+politics = df['politics'].astype(str).tolist()
+love = df['love_language'].astype(str).str.lower().tolist()
+pairs = [(a, b) for a in range(0, n, 3) for b in range(0, n, 5)]
+bytes_per_profile = sum(part.nbytes for value in feat.values() for part in (value if isinstance(value, tuple) else (value,))) / n
+
+# Non-integer stats fall back to exact floats
+fractional = df.astype({'stat_trust': np.float64})
+fractional.loc[fractional.index[0], 'stat_trust'] = 3.5
+fractional_matcher = Matcher(fractional)
+first = fractional_matcher.ids[0]
+row = fractional_matcher.score_matrix("friend")[0]
+
+checks = [
+    ("stats stored as uint8", feat['stats'].dtype == np.uint8 and (feat['stats'] == df[STAT_COLS].to_numpy()).all()),
+    ("categorical codes are small ints", feat['politics'].dtype.itemsize <= 2 and feat['love_language'].dtype.itemsize <= 2),
+    ("politics codes equal iff answers equal", all((feat['politics'][a] == feat['politics'][b]) == (politics[a] == politics[b]) for a, b in pairs)),
+    ("love language codes equal iff answers equal (case-insensitive)", all((feat['love_language'][a] == feat['love_language'][b]) == (love[a] == love[b]) for a, b in pairs)),
+    ("bitset Jaccard equals set Jaccard", all(store_jaccard(key, a, b) == jaccard(df[key].iloc[a], df[key].iloc[b]) for key in ('music', 'weekend') for a, b in pairs)),
+    ("under 64 bytes per profile", bytes_per_profile < 64),
+    ("fractional stats keep float values", fractional_matcher.features['stats'][0, 0] == 3.5),
+    ("fractional stats score like the matrix", all(row[j] == fractional_matcher.calculate_score(first, uid, "friend") for j, uid in enumerate(fractional_matcher.ids))),
+]
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+print(f"\n{bytes_per_profile:.1f} bytes per profile")
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,41 @@
+import json
+from smart_match import DataLoader, Matcher, Profiler, NULL_PROFILER
+
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+
+plain = Matcher(df)
+expected = plain.find_ideal_matches()
+
+profiler = Profiler()
+matcher = Matcher(df, profiler=profiler)
+matches = matcher.find_ideal_matches()
+matcher.find_groups()
+
+serial_profiler, sharded_profiler = Profiler(), Profiler()
+Matcher(df, profiler=serial_profiler).find_ideal_matches()
+Matcher(df, workers=2, profiler=sharded_profiler).find_ideal_matches()
+
+print("\n--- Testing --profile instrumentation ---")
+
+passed = True
+counters = profiler.summary()['counters']
+n = len(matcher.ids)
+checks = [
+    ("disabled by default", plain.profiler is NULL_PROFILER),
+    ("results unchanged", matches == expected),
+    ("phases recorded", {'encode', 'ideal_matches', 'groups'} <= set(profiler.phases)),
+    ("group slots counted", counters.get('group_slots', 0) > 0 and counters.get('group_candidates_scanned', 0) >= counters['group_slots']),
+    ("every pair accounted for", sum(v for k, v in serial_profiler.counters.items() if k.startswith('pairs_')) == n * n),
+    ("workers report the same counters", sharded_profiler.counters == serial_profiler.counters),
+    ("summary is JSON", json.loads(profiler.to_json()) == profiler.summary()),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+import numpy as np
+from smart_match import DataLoader, Matcher
+
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+matcher = Matcher(df)
+matches = matcher.find_ideal_matches()
+groups = matcher.find_groups()
+
+# Reference: the original line-at-a-time ranked report built with df.loc
+reference = ["", "=" * 40, "      RANKED PAIR MATCHES REPORT", "=" * 40]
+for idx, match_idx, score in sorted(((i, m, s) for i, (m, s) in matches.items()), key=lambda x: x[2], reverse=True):
+    user = df.loc[idx]
+    match_name = f"{df.loc[match_idx]['name']} ({df.loc[match_idx]['year']})" if match_idx is not None else "NO MATCH"
+    reference.append(f"[{score:.1f}] {user['name']} ({user['year']}) <--> {match_name}")
+
+def render(method, *args, fmt="text"):
+    out = io.StringIO()
+    method(*args, out=out, fmt=fmt)
+    return out.getvalue()
+
+print("\n--- Testing the report writer ---")
+
+passed = True
+ranked_text = render(matcher.generate_ranked_report, matches)
+rows = list(csv.DictReader(io.StringIO(render(matcher.generate_report, matches, groups, fmt="csv"))))
+records = [json.loads(line) for line in render(matcher.generate_ranked_report, matches, fmt="jsonl").splitlines()]
+checks = [
+    ("text matches the classic layout", ranked_text == "\n".join(reference) + "\n"),
+    ("csv has every match and member", sum(r['record'] == 'match' for r in rows) == len(matches)
+        and sum(r['record'] == 'group' for r in rows) == sum(len(g) for g in groups)),
+    ("jsonl ranked by score", [r['rank'] for r in records] == list(range(1, len(matches) + 1))
+        and all(np.diff([r['score'] if r['score'] is not None else -np.inf for r in records]) <= 0)),
+    ("jsonl scores are exact", {r['user_id']: r['score'] for r in records} == {uid: s for uid, (_, s) in matches.items() if s > -np.inf}
+        | {uid: None for uid, (_, s) in matches.items() if s == -np.inf}),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,87 @@
+import contextlib
+import csv
+import io
+import numpy as np
+import pandas as pd
+import smart_match
+from smart_match import DataLoader, Matcher
+
+df = DataLoader('data.csv').load_and_clean()
+
+print("--- Testing the round scheduler ---")
+
+def schedule(matcher, rounds, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return matcher.schedule_rounds(rounds, **kwargs)
+
+def valid(matcher, result, present=None):
+    present = set(matcher.ids if present is None else present)
+    mask = matcher.hard_compatible_mask("romantic")
+    seen_pairs = set()
+    for rnd in result['rounds']:
+        people = [uid for a, b, _ in rnd['pairs'] for uid in (a, b)]
+        if len(people) != len(set(people)) or set(people) | set(rnd['sitting_out']) != present or set(people) & set(rnd['sitting_out']):
+            return False
+        for a, b, _ in rnd['pairs']:
+            pair = frozenset((a, b))
+            if pair in seen_pairs or not mask[matcher.positions[a], matcher.positions[b]]:
+                return False
+            seen_pairs.add(pair)
+    return True
+
+checks = []
+matcher = Matcher(df)
+exact = schedule(matcher, 4)
+with contextlib.redirect_stdout(io.StringIO()):
+    mutual = matcher.find_mutual_matches()
+checks.append(("exact rounds: one-to-one, compatible, no repeats", valid(matcher, exact)))
+checks.append(("exact first round pairs as many as the mutual optimum", len(exact['rounds'][0]['pairs']) >= len(mutual['pairs'])))
+
+smart_match.EXACT_MATCHING_NODES = 0 # Force the greedy solver
+greedy = schedule(matcher, 4)
+checks.append(("greedy rounds: one-to-one, compatible, no repeats", valid(matcher, greedy)))
+checks.append(("greedy first round within 10% of the optimum", sum(s for *_, s in greedy['rounds'][0]['pairs']) >= 0.9 * mutual['objective']))
+smart_match.EXACT_MATCHING_NODES = 150
+
+# 5 straight men, 4 straight women, same year: 4 pairs a round, each man sits out exactly once
+small = pd.concat([df.iloc[:1]] * 9, ignore_index=True)
+small['gender'] = ['Male'] * 5 + ['Female'] * 4
+small['orientation'] = 'Heterosexual/Straight'
+small['year'] = 2027
+small['name'] = [f"P{i}" for i in range(9)]
+small_matcher = Matcher(small)
+for label in ("exact", "greedy"):
+    smart_match.EXACT_MATCHING_NODES = 150 if label == "exact" else 0
+    result = schedule(small_matcher, 5)
+    checks.append((f"{label}: every man sits out once in 5 rounds", result['sit_outs'] == {i: 1 for i in range(5)}))
+    checks.append((f"{label}: all 20 pairs used once", valid(small_matcher, result) and sum(len(r['pairs']) for r in result['rounds']) == 20))
+smart_match.EXACT_MATCHING_NODES = 150
+
+# Re-planning: earlier pairs stay excluded and only attendees are scheduled
+first = schedule(matcher, 1)
+present = matcher.ids[::2]
+replan = schedule(matcher, 2, met=[(a, b) for a, b, _ in first['rounds'][0]['pairs']],
+                  sit_outs={uid: 1 for uid in first['rounds'][0]['sitting_out']}, attendees=present)
+met = {frozenset((a, b)) for a, b, _ in first['rounds'][0]['pairs']}
+checks.append(("re-plan skips pairs already met", all(frozenset((a, b)) not in met for r in replan['rounds'] for a, b, _ in r['pairs'])))
+checks.append(("re-plan only schedules attendees", valid(matcher, replan, present)))
+
+out = io.StringIO()
+matcher.generate_rounds_report(exact, out, "csv")
+rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+text = io.StringIO()
+matcher.generate_rounds_report(exact, text)
+checks.append(("csv report has a round column", {r['round'] for r in rows} == {'1', '2', '3', '4'}
+               and sum(r['record'] == 'round_pair' for r in rows) == sum(len(r['pairs']) for r in exact['rounds'])))
+checks.append(("text report lists every round", all(f"--- ROUND {i} (" in text.getvalue() for i in range(1, 5))))
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import numpy as np
+from smart_match import DataLoader, Matcher
+
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+cache_dir = tempfile.mkdtemp()
+
+print("--- Testing the memory-mapped score cache ---")
+
+passed = True
+expected = Matcher(df).score_matrix(mode="romantic")
+first = Matcher(df, cache_dir=cache_dir).score_matrix(mode="romantic")
+files = sorted(os.listdir(cache_dir))
+second = Matcher(df, cache_dir=cache_dir).score_matrix(mode="romantic")
+files_after = sorted(os.listdir(cache_dir))
+
+edited = df.copy()
+edited.loc[edited.index[0], 'music'] = 'Polka'
+edited_key = Matcher(edited, cache_dir=cache_dir).score_cache_key("romantic")
+compact = Matcher(df, cache_dir=cache_dir, cache_dtype=np.float32).score_matrix(mode="romantic")
+
+checks = [
+    ("cache equals in-memory matrix", np.array_equal(first, expected)),
+    ("one file per mode", len(files) == 1 and files[0].endswith('.npy')),
+    ("rerun opens the memmap", isinstance(second, np.memmap) and files_after == files and np.array_equal(second, expected)),
+    ("edited answers change the key", edited_key != Matcher(df).score_cache_key("romantic")),
+    ("float32 cache within rounding", compact.dtype == np.float32 and np.allclose(compact, expected, atol=1e-4)),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher
+
+# Real export plus a few hand-made edge cases (missing year, missing answers, NB/queer profiles)
+loader = DataLoader('data.csv')
+df = loader.load_and_clean()
+extra = pd.DataFrame({
+    'name': ['No Year', 'Blank', 'NB Queer', 'Similar Seeker'],
+    'year': [np.nan, 2027, 2028, 2026],
+    'gender': ['Non-binary', np.nan, 'Agender', 'Male'],
+    'orientation': ['Bisexual', np.nan, 'Queer/Gay/Lesbian', 'Queer/Gay/Lesbian'],
+    'similar_preference': ['Similar', np.nan, 'Twin', 'Someone similar'],
+    'music': ['Pop', np.nan, 'Pop, Rap/Hip-hop', 'K-pop'],
+    'weekend': [np.nan, np.nan, 'Chill', 'Chill, Party'],
+    'love_language': ['Touch', np.nan, 'touch', 'Words'],
+    'politics': [np.nan, np.nan, 'Moderate', 'Moderate'],
+    'politics_preference': ['non-negotiable', np.nan, 'No', 'non-negotiable'],
+    'smoking': ['Yes I smoke, I do care', np.nan, 'No', "No I don't smoke, I do care"],
+    'stat_trust': [1, 3, 5, 2], 'stat_humor': [2, 3, 4, 5], 'stat_communication': [3, 3, 3, 1],
+    'stat_kindness': [4, 3, 2, 5], 'stat_looks': [5, 3, 1, 1], 'stat_money': [1, 3, 1, 4], 'stat_ambition': [2, 3, 5, 3],
+})
+df = pd.concat([df, extra], ignore_index=True)
+matcher = Matcher(df)
+
+print("--- Testing score_matrix against calculate_score ---")
+
+passed = True
+for mode in ["romantic", "friend"]:
+    matrix = matcher.score_matrix(mode=mode)
+    mismatches = 0
+    for i, idx_a in enumerate(matcher.ids):
+        for j, idx_b in enumerate(matcher.ids):
+            if matrix[i, j] != matcher.calculate_score(idx_a, idx_b, mode=mode):
+                mismatches += 1
+
+    status = "PASS" if mismatches == 0 else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{mode}: {len(matcher.ids) ** 2} pairs, {mismatches} mismatches -> {status}")
+
+print("\n--- Testing top_k against a full scan ---")
+
+for mode in ["romantic", "friend"]:
+    matrix = matcher.score_matrix(mode=mode)
+    mismatches = 0
+    for i, idx in enumerate(matcher.ids):
+        row = matrix[i].copy()
+        row[i] = -np.inf
+        valid = np.flatnonzero(row > -500)
+        order = valid[np.lexsort((valid, -row[valid]))][:10]
+        if matcher.top_k(idx, 10, mode=mode) != [(matcher.ids[j], row[j]) for j in order]:
+            mismatches += 1
+
+    status = "PASS" if mismatches == 0 else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{mode}: {len(matcher.ids)} queries, {mismatches} mismatches -> {status}")
+
+print("\n--- Testing --workers against the single-process path ---")
+
+serial = Matcher(matcher.df)
+sharded = Matcher(matcher.df, workers=3)
+members = list(matcher.ids[:7])
+checks = [
+    ("ideal matches", serial.find_ideal_matches(), sharded.find_ideal_matches()),
+    ("top_k_all", serial.top_k_all(10, mode="friend"), sharded.top_k_all(10, mode="friend")),
+    ("group fit", serial.group_fit_sums(members).tolist(), sharded.group_fit_sums(members).tolist()),
+]
+expected_top = {idx: matcher.top_k(idx, 10, mode="friend") for idx in matcher.ids}
+checks.append(("top_k_all vs top_k", expected_top, serial.top_k_all(10, mode="friend")))
+
+for name, expected, actual in checks:
+    status = "PASS" if expected == actual else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
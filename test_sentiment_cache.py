@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+from matching import SentimentCache
+
+path = os.path.join(tempfile.mkdtemp(), 'sentiment.json')
+responses = ["Sci-Fi", "Taylor Swift", "Great food!", "  sci-fi ", "SAD songs", "not bad"]
+
+print("--- Testing the sentiment cache ---")
+
+passed = True
+cache = SentimentCache(path)
+first = [cache.polarity(r) for r in responses]
+cache.save()
+
+from textblob import TextBlob
+fresh = SentimentCache(path)
+sys.modules.pop('textblob', None) # A warm cache must not need TextBlob at all
+warm = [fresh.polarity(r) for r in responses]
+warm_without_textblob = 'textblob' not in sys.modules
+
+bounded = SentimentCache(None, max_entries=2)
+for r in responses[:4]:
+    bounded.polarity(r)
+
+checks = [
+    ("matches TextBlob", first == [TextBlob(r).sentiment.polarity for r in responses]),
+    ("normalized keys", len(cache.entries) == 5),
+    ("persisted between runs", warm == first and not fresh.dirty and warm_without_textblob),
+    ("bounded", list(bounded.entries) == ["great food!", "sci-fi"]),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
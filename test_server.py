@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from server import create_app
+from smart_match import DataLoader, Matcher
+
+# Serve a copy of the export so the reload test can append to it
+workdir = tempfile.mkdtemp()
+data_path = os.path.join(workdir, 'data.csv')
+shutil.copy('data.csv', data_path)
+
+app = create_app(data_path)
+client = app.test_client()
+matcher = Matcher(DataLoader(data_path).load_and_clean())
+
+print("\n--- Testing the match service ---")
+
+passed = True
+first = matcher.ids[0]
+response = client.get(f'/match/{first}?k=7&mode=friend').get_json()
+group = client.get(f'/group/{first}').get_json()
+
+# Reload after a late sign-up; the old index keeps serving until the new one is swapped in
+raw = pd.read_csv(data_path)
+pd.concat([raw, raw.iloc[[0]]], ignore_index=True).to_csv(data_path, index=False)
+reload_status = client.post('/reload').status_code
+for _ in range(200):
+    health = client.get('/health').get_json()
+    if not health['reloading']:
+        break
+    time.sleep(0.05)
+
+checks = [
+    ("top-k matches", [(m['id'], m['score']) for m in response['matches']] == matcher.top_k(first, 7, mode="friend")),
+    ("group lookup", first in [m['id'] for m in group['members']]),
+    ("unknown id is 404", client.get('/match/999999').status_code == 404),
+    ("bad mode is 400", client.get(f'/match/{first}?mode=platonic').status_code == 400),
+    ("bad k is 400", client.get(f'/match/{first}?k=0').status_code == 400),
+    ("reload accepted", reload_status == 202),
+    ("reload swapped in", health['profiles'] == len(matcher.ids) + 1 and health['reload_error'] is None),
+]
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+shutil.rmtree(workdir)
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import os
+import tempfile
+import pandas as pd
+from convert import iter_user_responses
+from simulate import simulate_users, UserSimulator
+from smart_match import DataLoader, Matcher
+
+workdir = tempfile.mkdtemp()
+
+def simulate(name, n, fmt, seed, chunk_users):
+    path = os.path.join(workdir, name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulate_users(n, path, fmt, seed, 'data.csv', chunk_users)
+    with open(path, encoding='utf-8') as f:
+        return path, f.read()
+
+print("--- Testing simulate.py ---")
+
+long_path, long_a = simulate('long_a.csv', 250, 'long', 7, 64) # Several chunks, last one partial
+_, long_b = simulate('long_b.csv', 250, 'long', 7, 64)
+_, long_c = simulate('long_c.csv', 250, 'long', 8, 64)
+users = list(iter_user_responses(long_path, chunksize=100))
+questions = UserSimulator().responses
+valid = all(answers[q] in questions[q] for _, answers in users for q in questions)
+
+form_path, form_a = simulate('form_a.csv', 300, 'form', 3, 128)
+_, form_b = simulate('form_b.csv', 300, 'form', 3, 128)
+source = pd.read_csv('data.csv')
+form = pd.read_csv(form_path)
+sampled = all(set(form[c].dropna()) <= set(source[c].dropna()) for c in ['What is your gender?', 'Class Year', 'Trust', 'What are your Political Views?'])
+with contextlib.redirect_stdout(io.StringIO()):
+    df = DataLoader(form_path).load_and_clean()
+    matches = Matcher(df).find_ideal_matches()
+
+checks = [
+    ("same seed gives the same long file", long_a == long_b),
+    ("different seed gives a different long file", long_a != long_c),
+    ("long format has every user in order", [u for u, _ in users] == [f"User_{i}" for i in range(1, 251)]),
+    ("every user answers every question with a listed option", valid),
+    ("same seed gives the same form file", form_a == form_b),
+    ("form schema matches data.csv", list(form.columns) == list(source.columns) and len(form) == 300),
+    ("form answers come from the source export", sampled),
+    ("form ids are unique", form['Student Email'].is_unique),
+    ("DataLoader + Matcher run on the form output", len(df) == 300 and len(matches) > 0),
+]
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+from smart_match import DataLoader, Matcher, load_sweep
+
+# The export plus exact duplicates of some profiles, so best matches tie
+df = DataLoader('data.csv').load_and_clean()
+df = pd.concat([df, df.iloc[:30].set_axis(range(10000, 10030))])
+
+print("--- Testing the batched weight sweep ---")
+
+grid = {
+    'music': [0, 15, 40],
+    'core_stat': [5, 30],                 # 30 pushes raw scores past raw_max: ties at score_max
+    'raw_min': [-60, 50],                 # 50 clamps most scores to score_min
+    'politics_mismatch_non_negotiable': [-50, 5],
+}
+configs = load_sweep(grid)
+
+def ideal(weights):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Matcher(df, weights=weights).find_ideal_matches()
+
+checks = [("grid expands to every combination", len(configs) == 24 and configs[2]['raw_min'] == 50)]
+
+matcher = Matcher(df)
+summaries = matcher.sweep_weights(grid)
+baseline = ideal(None)
+exact = True
+for weights, summary in zip(configs, summaries):
+    matches = ideal(weights)
+    scores = np.array([s for m, s in matches.values() if m is not None])
+    exact &= (summary['matched'] == len(scores)
+              and summary['unmatched'] == len(matches) - len(scores)
+              and summary['best_min'] == scores.min() and summary['best_max'] == scores.max()
+              and summary['best_median'] == np.median(scores) and np.isclose(summary['best_mean'], scores.mean())
+              and summary['changed'] == sum(matches[uid][0] != baseline[uid][0] for uid in matches))
+checks.append(("every config summarizes exactly what find_ideal_matches gives under it", exact))
+checks.append(("clamped configs are covered", any(s['best_max'] == 98.6 for s in summaries) and any(s['best_min'] == 38.8 for s in summaries)))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    sharded = Matcher(df, workers=2).sweep_weights(grid)
+checks.append(("sharded sweep gives identical summaries", sharded == summaries))
+checks.append(("a list of configs is accepted", matcher.sweep_weights([{'music': 20}, {}])[1]['changed'] == 0))
+
+try:
+    load_sweep({'music': [10], 'raw_max': [-70]})
+    checks.append(("invalid configs are rejected", False))
+except ValueError:
+    checks.append(("invalid configs are rejected", True))
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")
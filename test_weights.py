@@ -0,0 +1,85 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import numpy as np
+from smart_match import DataLoader, Matcher, load_weights, DEFAULT_WEIGHTS, SCORE_TERMS
+
+df = DataLoader('data.csv').load_and_clean()
+
+print("--- Testing configurable weights and score breakdowns ---")
+
+custom = {'politics_match': 4, 'smoking_conflict': -80, 'music': 25, 'core_stat': 7.5,
+          'soft_stat_other': 0, 'love_language': 2, 'raw_min': -100, 'score_max': 100}
+path = os.path.join(tempfile.mkdtemp(), 'weights.json')
+with open(path, 'w') as f:
+    json.dump(custom, f)
+
+def invalid(weights):
+    try:
+        load_weights(weights)
+    except ValueError:
+        return True
+    return False
+
+checks = []
+default = Matcher(df)
+weighted = Matcher(df, weights=path)
+n = len(weighted.ids)
+sample = [(weighted.ids[a], weighted.ids[b]) for a in range(0, n, 7) for b in range(0, n, 3)]
+for mode in ("romantic", "friend"):
+    matrix = weighted.score_matrix(mode)
+    positions = weighted.positions
+    checks.append((f"{mode}: custom matrix equals calculate_score",
+                   all(matrix[positions[a], positions[b]] == weighted.calculate_score(a, b, mode) for a, b in sample)))
+    store = default.build_pair_store()
+    recombined = store.score_matrix(mode, weighted.weights)
+    matrix = matrix.copy()
+    np.fill_diagonal(matrix, -np.inf)
+    checks.append((f"{mode}: default store recombines to the custom matrix", np.array_equal(recombined, matrix)))
+checks.append(("custom weights change scores", not np.array_equal(default.score_matrix("friend"), weighted.score_matrix("friend"))))
+checks.append(("explicit default weights share the default cache key", Matcher(df, weights={}).score_cache_key() == default.score_cache_key()))
+checks.append(("weights are part of the cache key", weighted.score_cache_key() != default.score_cache_key()))
+
+# Breakdowns add up, with and without the store
+exact = True
+for matcher in (Matcher(df, weights=custom), weighted):
+    for a, b in sample:
+        parts = matcher.score_breakdown(a, b, "romantic")
+        score = matcher.calculate_score(a, b, "romantic")
+        if parts is None:
+            exact &= score == -1000
+        else:
+            exact &= (list(parts)[:-2] == SCORE_TERMS and parts['score'] == score
+                      and abs(sum(parts[t] for t in SCORE_TERMS) - parts['raw']) < 1e-9)
+checks.append(("breakdown terms sum to the raw score and match calculate_score", exact))
+
+# Re-weighting in place
+with contextlib.redirect_stdout(io.StringIO()):
+    default.set_weights(path)
+    reweighted = default.find_ideal_matches()
+    expected = Matcher(df, weights=path).find_ideal_matches()
+checks.append(("set_weights gives the same matches as a fresh matcher", reweighted == expected))
+default.set_weights(None)
+checks.append(("set_weights(None) restores the defaults", default.weights == DEFAULT_WEIGHTS))
+top = weighted.top_k(weighted.ids[0], 10, "friend")
+row = weighted.score_matrix("friend")[0].copy()
+row[0] = -np.inf
+order = np.lexsort((np.arange(n), -row))[:10]
+checks.append(("top_k stays exact under custom weights", top == [(weighted.ids[j], row[j]) for j in order]))
+
+checks.append(("unknown keys are rejected", invalid({'politcs_match': 3})))
+checks.append(("an empty normalization range is rejected", invalid({'raw_min': 90})))
+checks.append(("penalties that read as hard-incompatible are rejected", invalid({'smoking_conflict': -600})))
+
+passed = True
+for name, ok in checks:
+    status = "PASS" if ok else "FAIL"
+    if status == "FAIL": passed = False
+    print(f"{name}: {status}")
+
+if passed:
+    print("\nALL TESTS PASSED")
+else:
+    print("\nSOME TESTS FAILED")